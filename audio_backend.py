@@ -0,0 +1,105 @@
+import math
+import threading
+import time
+import zlib
+from array import array
+from collections import namedtuple
+
+from speech_backend import speaking_time
+
+# Mono 16-bit PCM frames of one rendered text
+AudioChunk = namedtuple('AudioChunk', 'frames sample_rate')
+
+# AVAudioCommonFormat
+PCM_FLOAT32, PCM_INT16 = 1, 3
+
+
+class AudioBackend:
+    """Interface of synthesizers that render speech into audio buffers instead of speaking it.
+    render() may be called from several threads at once.
+    """
+    def render(self, text: str, voice_id, rate: float) -> AudioChunk:
+        raise NotImplementedError
+
+
+def to_int16(samples) -> bytes:
+    """Convert float samples from -1 to 1 into 16-bit PCM frames.
+    """
+    return array('h', [int(max(-1.0, min(sample, 1.0)) * 32767) for sample in samples]).tobytes()
+
+
+class ObjCAudioBackend(AudioBackend):
+    """Renders with AVSpeechSynthesizer's writeUtterance:toBufferCallback: via objc_util. Only available in Pythonista (iOS 13+).
+
+    Every render uses its own synthesizer, so workers don't wait for each other's utterances.
+    """
+    def __init__(self, timeout=600):
+        self.timeout = timeout  # seconds to wait for the synthesizer to deliver the last buffer
+
+    def render(self, text, voice_id, rate):
+        import ctypes
+        from objc_util import ObjCBlock, ObjCClass, ObjCInstance, ns
+
+        synthesizer = ObjCClass('AVSpeechSynthesizer').alloc().init()
+        utterance = ObjCClass('AVSpeechUtterance').alloc().initWithString_(ns(text))
+        if voice_id:
+            utterance.setVoice_(ObjCClass('AVSpeechSynthesisVoice').voiceWithIdentifier_(ns(voice_id)))
+        utterance.setRate_(max(0, min(rate, 1)))
+
+        chunks = []
+        sample_rate = []
+        done = threading.Event()
+
+        def on_buffer(_block, buffer_ptr):
+            buffer = ObjCInstance(buffer_ptr)
+            frames = buffer.frameLength()
+            # the last buffer is empty
+            if not frames:
+                done.set()
+                return
+
+            audio_format = buffer.format()
+            sample_rate.append(int(audio_format.sampleRate()))
+            if audio_format.commonFormat() == PCM_INT16:
+                channels = ctypes.cast(buffer.int16ChannelData(), ctypes.POINTER(ctypes.POINTER(ctypes.c_int16)))
+                chunks.append(ctypes.string_at(channels[0], frames * 2))
+            else:
+                channels = ctypes.cast(buffer.floatChannelData(), ctypes.POINTER(ctypes.POINTER(ctypes.c_float)))
+                chunks.append(to_int16(channels[0][:frames]))
+
+        callback = ObjCBlock(on_buffer, restype=None, argtypes=[ctypes.c_void_p, ctypes.c_void_p])
+        synthesizer.writeUtterance_toBufferCallback_(utterance, callback)
+
+        if not done.wait(self.timeout):
+            print(f"Error rendering audio: no last buffer after {self.timeout} s")
+        return AudioChunk(b''.join(chunks), sample_rate[0] if sample_rate else 22050)
+
+
+class SyntheticAudioBackend(AudioBackend):
+    """Stand-in renderer that runs anywhere: every text becomes a tone as long as speaking it would take.
+
+    Each voice gets its own pitch. A real engine synthesizes outside of Python, so the stand-in releases the
+    GIL for realtime_factor times the audio's duration (0.01 is 100 times faster than realtime).
+    """
+    def __init__(self, sample_rate=22050, realtime_factor=0.01):
+        self.sample_rate = sample_rate
+        self.realtime_factor = realtime_factor
+        self.periods = {}  # one period of the tone of each voice
+
+    def period(self, voice_id) -> bytes:
+        period = self.periods.get(voice_id)
+        if period is None:
+            frequency = 120 + zlib.crc32(str(voice_id).encode()) % 180
+            length = max(2, round(self.sample_rate / frequency))
+            period = to_int16(0.3 * math.sin(2 * math.pi * i / length) for i in range(length))
+            self.periods[voice_id] = period
+        return period
+
+    def render(self, text, voice_id, rate):
+        seconds = speaking_time(text, rate)
+        size = int(seconds * self.sample_rate) * 2
+        period = self.period(voice_id)
+        frames = (period * (size // len(period) + 1))[:size]
+
+        time.sleep(seconds * self.realtime_factor)
+        return AudioChunk(frames, self.sample_rate)
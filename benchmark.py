@@ -0,0 +1,1061 @@
+"""Benchmarks for the parts of Clipboard Reader that run without Pythonista.
+
+Run with: python benchmark.py [benchmark ...] [--json results.json]
+Speech is simulated by FakeSpeechBackend, so whole documents can be read end to end on any machine.
+python benchmark.py --check [check ...] runs assertion checks of the same components instead, e.g. after a change.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import textwrap
+import threading
+import time
+import timeit
+import tracemalloc
+
+from audio_backend import SyntheticAudioBackend
+from clipboard_reader import ClipboardReader
+from clipboard_watcher import ClipboardWatcher, FakeClipboardSource, fingerprint
+from language_detection import CachedDetector, LanguageDetector, has_words
+from language_runs import LanguageRuns
+from ngram_detector import NgramDetector, load_models
+from pipeline import NOT_READY, Pipeline, PreparedBlock
+from preferences import COALESCE_SECONDS, DETECTION_BATCH, RATE, RATE_TAP_DELAY, UI_FRAMES_PER_SECOND, VOICE_PREFERENCES, WATCH_DEBOUNCE, WATCH_INTERVAL
+from profiling import Timings
+from rate_control import RateChanger
+from render import render_document
+from scheduler import UtteranceScheduler
+from segmenter import BlockTable, clear_block, iter_block_spans, iter_blocks, iter_flagged_spans
+from sessions import SessionStore
+from speech_backend import FakeSpeechBackend, chars_per_second
+from view_updates import FakeView, ViewUpdater
+from voices import VoiceIndex, load_voice_index, reference_catalog
+
+SAMPLE_PARAGRAPH = (
+    'The reader splits text into blocks. Each block is usually a sentence! '
+    'Footnotes like this.12 are removed and hyphen- ated words are fused.\n'
+    'PDFs often break lines in the middle of a sentence\n'
+    'so every line becomes a block of its own?\n\n'
+)
+
+
+def sample_text(size: int) -> str:
+    """Return sample text of roughly size characters.
+    """
+    return SAMPLE_PARAGRAPH * (size // len(SAMPLE_PARAGRAPH) + 1)
+
+
+# short labeled sentences, none of them is part of the training texts in ngram_profiles.py
+LABELED_SAMPLES = [
+    ('en', 'The train was late again, so we missed the beginning of the concert.'),
+    ('en', 'Could you please send me the documents by Friday?'),
+    ('en', 'My grandmother grows tomatoes and beans in her small garden.'),
+    ('de', 'Der Zug hatte wieder Verspätung, deshalb haben wir den Anfang des Konzerts verpasst.'),
+    ('de', 'Könnten Sie mir bitte die Unterlagen bis Freitag schicken?'),
+    ('de', 'Meine Großmutter pflanzt Tomaten und Bohnen in ihrem kleinen Garten.'),
+    ('fr', 'Le train était encore en retard, donc nous avons manqué le début du concert.'),
+    ('fr', "Pourriez-vous m'envoyer les documents avant vendredi, s'il vous plaît ?"),
+    ('fr', 'Ma grand-mère cultive des tomates et des haricots dans son petit jardin.'),
+    ('es', 'El tren volvió a llegar tarde, así que nos perdimos el comienzo del concierto.'),
+    ('es', '¿Podría enviarme los documentos antes del viernes, por favor?'),
+    ('es', 'Mi abuela cultiva tomates y judías en su pequeño huerto.'),
+    ('it', "Il treno era di nuovo in ritardo, così abbiamo perso l'inizio del concerto."),
+    ('it', 'Potrebbe mandarmi i documenti entro venerdì, per favore?'),
+    ('it', 'Mia nonna coltiva pomodori e fagioli nel suo piccolo giardino.'),
+    ('pt', 'O comboio voltou a atrasar, por isso perdemos o início do concerto.'),
+    ('pt', 'Poderia enviar-me os documentos até sexta-feira, por favor?'),
+    ('pt', 'A minha avó cultiva tomates e feijões no seu pequeno jardim.'),
+    ('ca', "El tren va tornar a arribar tard, així que ens vam perdre el començament del concert."),
+    ('ca', 'Em podries enviar els documents abans de divendres, si us plau?'),
+    ('ca', 'La meva àvia cultiva tomàquets i mongetes al seu petit hort.'),
+    ('nl', 'De trein was weer te laat, dus we hebben het begin van het concert gemist.'),
+    ('nl', 'Kunt u mij de documenten alstublieft voor vrijdag sturen?'),
+    ('nl', 'Mijn oma kweekt tomaten en bonen in haar kleine tuin.'),
+    ('da', 'Toget var forsinket igen, så vi gik glip af begyndelsen af koncerten.'),
+    ('da', 'Kan du sende mig dokumenterne inden fredag?'),
+    ('da', 'Min mormor dyrker tomater og bønner i sin lille have.'),
+    ('nb', 'Toget var forsinket igjen, så vi gikk glipp av begynnelsen av konserten.'),
+    ('nb', 'Kan du sende meg dokumentene innen fredag?'),
+    ('nb', 'Bestemoren min dyrker tomater og bønner i den lille hagen sin.'),
+    ('sv', 'Tåget var försenat igen, så vi missade början av konserten.'),
+    ('sv', 'Kan du skicka dokumenten till mig senast på fredag?'),
+    ('sv', 'Min mormor odlar tomater och bönor i sin lilla trädgård.'),
+    ('fi', 'Juna oli taas myöhässä, joten missasimme konsertin alun.'),
+    ('fi', 'Voisitko lähettää minulle asiakirjat perjantaihin mennessä?'),
+    ('fi', 'Isoäitini kasvattaa tomaatteja ja papuja pienessä puutarhassaan.'),
+    ('pl', 'Pociąg znowu się spóźnił, więc przegapiliśmy początek koncertu.'),
+    ('pl', 'Czy mógłby Pan przesłać mi dokumenty do piątku?'),
+    ('pl', 'Moja babcia uprawia pomidory i fasolę w swoim małym ogródku.'),
+    ('cs', 'Vlak měl zase zpoždění, takže jsme zmeškali začátek koncertu.'),
+    ('cs', 'Mohl byste mi prosím poslat dokumenty do pátku?'),
+    ('cs', 'Moje babička pěstuje rajčata a fazole na své malé zahrádce.'),
+    ('sk', 'Vlak mal zase meškanie, takže sme zmeškali začiatok koncertu.'),
+    ('sk', 'Mohli by ste mi prosím poslať dokumenty do piatku?'),
+    ('sk', 'Moja babka pestuje paradajky a fazuľu vo svojej malej záhradke.'),
+    ('hr', 'Vlak je opet kasnio, pa smo propustili početak koncerta.'),
+    ('hr', 'Možete li mi molim vas poslati dokumente do petka?'),
+    ('hr', 'Moja baka uzgaja rajčice i grah u svom malom vrtu.'),
+    ('hu', 'A vonat megint késett, ezért lekéstük a koncert elejét.'),
+    ('hu', 'Elküldené nekem a dokumentumokat péntekig?'),
+    ('hu', 'A nagymamám paradicsomot és babot termeszt a kis kertjében.'),
+    ('ro', 'Trenul a întârziat din nou, așa că am pierdut începutul concertului.'),
+    ('ro', 'Ați putea să-mi trimiteți documentele până vineri, vă rog?'),
+    ('ro', 'Bunica mea cultivă roșii și fasole în grădina ei mică.'),
+    ('tr', 'Tren yine gecikti, bu yüzden konserin başlangıcını kaçırdık.'),
+    ('tr', 'Belgeleri bana cumaya kadar gönderebilir misiniz?'),
+    ('tr', 'Büyükannem küçük bahçesinde domates ve fasulye yetiştiriyor.'),
+    ('id', 'Keretanya terlambat lagi, jadi kami melewatkan awal konser.'),
+    ('id', 'Bisakah Anda mengirimkan dokumen itu kepada saya sebelum hari Jumat?'),
+    ('id', 'Nenek saya menanam tomat dan kacang di kebun kecilnya.'),
+    ('ms', 'Kereta api lewat lagi, jadi kami terlepas permulaan konsert itu.'),
+    ('ms', 'Bolehkah anda menghantar dokumen itu kepada saya sebelum hari Jumaat?'),
+    ('ms', 'Nenek saya bercucuk tanam tomato dan kacang di laman rumahnya yang kecil.'),
+    ('vi', 'Tàu lại bị trễ, nên chúng tôi đã bỏ lỡ phần đầu của buổi hòa nhạc.'),
+    ('vi', 'Bạn có thể gửi cho tôi các tài liệu trước thứ Sáu được không?'),
+    ('vi', 'Bà tôi trồng cà chua và đậu trong khu vườn nhỏ của bà.'),
+    ('ru', 'Поезд снова опоздал, поэтому мы пропустили начало концерта.'),
+    ('ru', 'Не могли бы вы прислать мне документы до пятницы?'),
+    ('ru', 'Моя бабушка выращивает помидоры и фасоль в своём маленьком саду.'),
+    ('uk', 'Потяг знову запізнився, тому ми пропустили початок концерту.'),
+    ('uk', "Чи не могли б ви надіслати мені документи до п'ятниці?"),
+    ('uk', 'Моя бабуся вирощує помідори та квасолю у своєму маленькому садку.'),
+    ('bg', 'Влакът отново закъсня, затова изпуснахме началото на концерта.'),
+    ('bg', 'Бихте ли ми изпратили документите до петък?'),
+    ('bg', 'Баба ми отглежда домати и боб в малката си градина.'),
+    ('el', 'Το τρένο άργησε ξανά, οπότε χάσαμε την αρχή της συναυλίας.'),
+    ('ar', 'تأخر القطار مرة أخرى، لذلك فاتتنا بداية الحفلة.'),
+    ('he', 'הרכבת שוב איחרה, אז פספסנו את תחילת הקונצרט.'),
+    ('hi', 'ट्रेन फिर से देर से आई, इसलिए हम संगीत कार्यक्रम की शुरुआत से चूक गए।'),
+    ('th', 'รถไฟมาสายอีกแล้ว เราจึงพลาดช่วงเริ่มต้นของคอนเสิร์ต'),
+    ('ko', '기차가 또 늦어서 우리는 콘서트의 시작을 놓쳤다.'),
+    ('ja', '電車がまた遅れたので、コンサートの始まりを見逃しました。'),
+    ('zh', '火车又晚点了，所以我们错过了音乐会的开头。'),
+]
+
+
+def eager_blocks(content: str) -> list:
+    """Previous implementation: split everything, then clean every block.
+    """
+    blocks = re.split(r'(?:\n\s*\n|(?<=[.!?]) +|\n+)', content)
+    return [clear_block(block) for block in blocks if block.strip()]
+
+
+def measure(func):
+    """Return result, seconds and peak traced memory in bytes of func().
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_segmenter():
+    """Time-to-first-block and peak memory of eager splitting vs. the lazy segmenter.
+    """
+    print('segmenter: time to first block / peak memory')
+    for label, size in (('10 KB', 10_000), ('1 MB', 1_000_000), ('20 MB', 20_000_000)):
+        content = sample_text(size)
+
+        _, eager_s, eager_peak = measure(lambda: eager_blocks(content)[0])
+        _, lazy_s, lazy_peak = measure(lambda: next(iter_blocks(content)))
+        _, full_s, full_peak = measure(lambda: sum(1 for _ in iter_blocks(content)))
+
+        print(f'  {label:>5}: eager {eager_s * 1000:9.2f} ms {eager_peak / 1e6:8.2f} MB'
+              f' | lazy {lazy_s * 1000:7.3f} ms {lazy_peak / 1e6:6.3f} MB'
+              f' | lazy, all blocks {full_s * 1000:9.2f} ms {full_peak / 1e6:6.3f} MB')
+
+
+class SimulatedSynthesizer:
+    """Minimal synthesizer that queues utterances and finishes them one by one on demand.
+    """
+    def __init__(self):
+        self.utterances = []
+        self.active = False
+        self.on_start = None
+        self.on_finish = None
+
+    def speak(self, text):
+        self.utterances.append(text)
+        if not self.active:
+            self.start_next()
+
+    def start_next(self):
+        if self.utterances:
+            self.active = True
+            self.on_start()
+
+    def finish_current(self):
+        self.utterances.pop(0)
+        self.active = False
+        self.on_finish()
+        if not self.active:
+            self.start_next()
+
+
+def bench_scheduler(sentences=2000):
+    """Silence between blocks: 1-second polling vs. the event-driven scheduler.
+    """
+    print(f'scheduler: gaps between {sentences} blocks')
+
+    # polling: the next block starts at the next poll tick after the previous one finished
+    rng = random.Random(0)
+    now, polling_gaps = 0.0, []
+    for _ in range(sentences - 1):
+        finished = now + rng.uniform(2, 8)
+        now = math.ceil(finished)
+        polling_gaps.append(now - finished)
+    print(f'  polling every 1 s: mean {sum(polling_gaps) / len(polling_gaps) * 1000:7.1f} ms,'
+          f' total silence {sum(polling_gaps) / 60:5.1f} min')
+
+    for lookahead in (1, 3):
+        synthesizer = SimulatedSynthesizer()
+        blocks = iter(['A sentence.'] * sentences)
+        scheduler = UtteranceScheduler(lambda: next(blocks, None), synthesizer.speak, lookahead=lookahead)
+        synthesizer.on_start = scheduler.on_started
+        synthesizer.on_finish = scheduler.on_finished
+
+        scheduler.start()
+        while synthesizer.utterances:
+            synthesizer.finish_current()
+
+        gaps = scheduler.gap_summary()
+        print(f'  event-driven, lookahead {lookahead}: mean {gaps["mean"] * 1e6:7.1f} us,'
+              f' max {gaps["max"] * 1e6:7.1f} us, total silence {gaps["mean"] * gaps["count"] * 1000:6.2f} ms')
+
+
+class StubVoice:
+    """Stands in for an AVSpeechSynthesisVoice: every attribute is a method call like over the ObjC bridge.
+    """
+    def __init__(self, voice):
+        self._voice = voice
+
+    def name(self):
+        return self._voice['name']
+
+    def language(self):
+        return self._voice['language']
+
+    def identifier(self):
+        return self._voice['identifier']
+
+
+def scan_voices(voices, lng):
+    """Previous implementation: walk all voices for every block.
+    """
+    name = language = identifier = None
+    for voice in voices:
+        if not str(voice.language()).startswith(lng):
+            continue
+        name, language, identifier = str(voice.name()), str(voice.language()), str(voice.identifier())
+        if name in VOICE_PREFERENCES:
+            break
+    return name, language, identifier
+
+
+def bench_voices(blocks=10_000):
+    """Startup and per-block voice selection: scanning the voice list vs. the voice index.
+    """
+    catalog = reference_catalog()
+    stubs = [StubVoice(voice) for voice in catalog]
+    languages = ['en', 'de', 'fr', 'es', 'zh', 'ja', 'xx']
+    print(f'voices: {len(catalog)} voices, {blocks} blocks')
+
+    for lng in languages:
+        voice = VoiceIndex(catalog).select(lng) or {'name': None, 'language': None, 'identifier': None}
+        assert (voice['name'], voice['language'], voice['identifier']) == scan_voices(stubs, lng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'voice_catalog.json')
+
+        start = time.perf_counter()
+        load_voice_index(path, list_voices=lambda: [{'name': str(v.name()), 'language': str(v.language()),
+                                                     'identifier': str(v.identifier())} for v in stubs])
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_voice_index(path, list_voices=lambda: catalog)
+        cached = time.perf_counter() - start
+    print(f'  startup: enumerate + index {cold * 1000:6.2f} ms | cached catalog + index {cached * 1000:6.2f} ms')
+
+    start = time.perf_counter()
+    for i in range(blocks):
+        scan_voices(stubs, languages[i % len(languages)])
+    scan = time.perf_counter() - start
+
+    index = VoiceIndex(catalog)
+    start = time.perf_counter()
+    for i in range(blocks):
+        index.select(languages[i % len(languages)])
+    lookup = time.perf_counter() - start
+    print(f'  per block: scan {scan / blocks * 1e6:7.2f} us | index {lookup / blocks * 1e6:7.3f} us')
+
+
+class StubDetector(LanguageDetector):
+    """Pretends to be a slow detector by burning a fixed amount of time per call.
+    """
+    def __init__(self, seconds=50e-6):
+        self.seconds = seconds
+        self.calls = 0
+
+    def detect(self, text):
+        self.calls += 1
+        end = time.perf_counter() + self.seconds
+        while time.perf_counter() < end:
+            pass
+        return 'en'
+
+
+def bench_detection_cache(reads=3):
+    """Detection time with and without the LRU cache when the same clipboard is read several times.
+    """
+    blocks = list(iter_blocks(sample_text(100_000)))
+    print(f'detection cache: {len(blocks)} blocks, read {reads} times')
+
+    for label, detector in (('uncached', StubDetector()), ('cached', CachedDetector(StubDetector(), 512))):
+        start = time.perf_counter()
+        for _ in range(reads):
+            for block in blocks:
+                detector.detect(block)
+        seconds = time.perf_counter() - start
+
+        stats = f'hits {detector.hits}, misses {detector.misses}' if isinstance(detector, CachedDetector) else ''
+        print(f'  {label:>8}: {seconds * 1000:8.2f} ms {stats}')
+
+    # whole paragraphs as detected by LanguageRuns: the cache keeps digests, not the paragraphs
+    paragraphs = [f'{i}. ' + ' '.join(blocks[i % len(blocks):i % len(blocks) + 20]) for i in range(512)]
+    detector = CachedDetector(StubDetector(0), 512)
+    tracemalloc.start()
+    for paragraph in paragraphs:
+        detector.detect(paragraph)
+    cached = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'  {len(paragraphs)} paragraphs of {sum(map(len, paragraphs)) / 1e3:.0f} KB cached in {cached / 1e3:.0f} KB')
+
+
+def bench_ngram_detector(rounds=20):
+    """Accuracy of the n-gram detector on the labeled samples and its throughput one by one and batched.
+    """
+    start = time.perf_counter()
+    load_models()
+    print(f'n-gram detector: profiles built in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    texts = [text for _, text in LABELED_SAMPLES]
+    detected = NgramDetector().detect_many(texts)
+    correct = sum(language == result for (language, _), result in zip(LABELED_SAMPLES, detected))
+    print(f'  accuracy: {correct}/{len(texts)} ({correct / len(texts):.1%})')
+    for (language, text), result in zip(LABELED_SAMPLES, detected):
+        if language != result:
+            print(f'    {language} detected as {result}: {text}')
+
+    # distinct sentences, so batches can't skip repeated texts, but with the word repetition of real text
+    sentences = generated_sentences(2000)
+    rates = []
+    for label, size in (('one by one', 1), (f'batches of {DETECTION_BATCH}', DETECTION_BATCH), ('all at once', len(sentences))):
+        detector = NgramDetector()
+        start = time.perf_counter()
+        for i in range(0, len(sentences), size):
+            detector.detect_many(sentences[i:i + size])
+        rates.append(f'{len(sentences) / (time.perf_counter() - start):,.0f} blocks/s {label}')
+    print(f'  throughput: {" | ".join(rates)}')
+
+    # the same through ClipboardReader.prepare_table, which detects DETECTION_BATCH blocks at a time
+    content = '\n\n'.join(' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+    catalog = reference_catalog()
+    rates = []
+    for batch in (1, DETECTION_BATCH):
+        reader = ClipboardReader(FakeSpeechBackend(catalog), NgramDetector(), VoiceIndex(catalog))
+        table = reader.block_table(content)
+        start = time.perf_counter()
+        blocks = sum(1 for _ in reader.prepare_table(table, batch=batch))
+        rates.append(f'{blocks / (time.perf_counter() - start):,.0f} blocks/s with batch {batch}')
+    print(f'  prepared: {" | ".join(rates)}')
+
+
+def generated_sentences(count: int, seed=0) -> list:
+    """Return count random sentences made of the words of the labeled samples, five in a row of the same language.
+    """
+    rng = random.Random(seed)
+    vocabulary = {}
+    for language, text in LABELED_SAMPLES:
+        vocabulary.setdefault(language, []).extend(text.rstrip('.?!').split())
+    languages = sorted(vocabulary)
+
+    sentences = []
+    for i in range(count):
+        words = vocabulary[languages[i // 5 % len(languages)]]
+        sentences.append(' '.join(rng.choice(words) for _ in range(rng.randint(6, 16))) + '.')
+    return sentences
+
+
+def mixed_language_text(paragraphs=300) -> str:
+    """Return a document of paragraphs in alternating languages, each with a numbered heading and a short reply.
+    """
+    by_language = {}
+    for language, text in LABELED_SAMPLES:
+        by_language.setdefault(language, []).append(text)
+    replies = {'en': 'Yes, indeed.', 'de': 'Ja, gut.', 'fr': 'Oui, bien sûr.', 'es': 'Sí, claro.'}
+
+    parts = []
+    for i in range(paragraphs):
+        language = ('en', 'de', 'fr', 'es')[i // 3 % 4]
+        parts.append(f'{i + 1}.\n' + ' '.join(by_language[language]) + ' ' + replies[language])
+    return '\n\n'.join(parts)
+
+
+def bench_language_runs():
+    """Per-block detection vs. paragraph runs: detection time and number of voice switches.
+    """
+    content = mixed_language_text()
+    spans = list(iter_block_spans(content))
+    print(f'language runs: {len(spans)} blocks, mixed en/de/fr/es')
+
+    def switches(languages):
+        return sum(a != b for a, b in zip(languages, languages[1:]))
+
+    detector = NgramDetector()
+    start = time.perf_counter()
+    languages, previous = [], None
+    for begin, end in spans:
+        # same fallback as ClipboardReader.detect_language
+        block = content[begin:end]
+        previous = detector.detect(block) if has_words(block) else previous or 'en'
+        languages.append(previous)
+    per_block = time.perf_counter() - start
+    print(f'  per block: {per_block * 1000:7.2f} ms, {len(spans)} detections, {switches(languages)} voice switches')
+
+    start = time.perf_counter()
+    runs = LanguageRuns(content, NgramDetector().detect)
+    languages = [runs.language_at(begin) for begin, _ in spans]
+    document = time.perf_counter() - start
+    print(f'  runs:      {document * 1000:7.2f} ms, {runs.detections} detections, {switches(languages)} voice switches')
+
+
+def bench_pipeline(speaking_time=0.002):
+    """Time to first block, queue depth and stalls of the background pipeline while playback takes speaking_time per block.
+    """
+    content = mixed_language_text()
+    detector = CachedDetector(NgramDetector())
+    index = VoiceIndex(reference_catalog())
+
+    def prepare(content):
+        language = 'en'
+        for start, end in iter_block_spans(content):
+            block = clear_block(content[start:end])
+            language = detector.detect(block) if has_words(block) else language
+            yield PreparedBlock(block, language, index.select(language), None)
+
+    for depth in (1, 8, 32):
+        detector.clear()
+        pipeline = Pipeline(prepare, depth)
+        start = time.perf_counter()
+        pipeline.start(content)
+        block, blocks = pipeline.next_block(), 0
+        first = time.perf_counter() - start
+        while block is not None:
+            blocks += 1
+            time.sleep(speaking_time)
+            block = pipeline.next_block()
+
+        metrics = pipeline.metrics()
+        print(f'pipeline depth {depth:>2}: {blocks} blocks, first after {first * 1000:5.2f} ms,'
+              f' mean depth {metrics["mean_depth"]:5.1f}, {metrics["stalls"]} stalls ({metrics["stall_time"] * 1000:.1f} ms)')
+
+    # the app's main thread never waits: with on_ready next_block returns NOT_READY during a stall
+    def slow_prepare(content):
+        for block in prepare(content):
+            time.sleep(speaking_time * 2)
+            yield block
+
+    for label, waits in (('waiting', True), ('on_ready', False)):
+        ready = threading.Event()
+        pipeline = Pipeline(slow_prepare, 8, on_ready=None if waits else ready.set)
+        pipeline.start(content)
+        longest, blocks, block = 0.0, 0, NOT_READY
+        while block is not None:
+            start = time.perf_counter()
+            block = pipeline.next_block()
+            longest = max(longest, time.perf_counter() - start)
+            if block is NOT_READY:
+                ready.wait()
+                ready.clear()
+            elif block is not None:
+                blocks += 1
+                if blocks == 200:
+                    pipeline.cancel()
+        print(f'pipeline {label:>8}: longest next_block call {longest * 1000:6.2f} ms, {pipeline.stalls} stalls')
+
+
+def headless_app(lookahead=1, depth=8, timings=None):
+    """Wire reader, pipeline and scheduler like ClipboardReaderApp does, but with the fake speech backend.
+    """
+    catalog = reference_catalog()
+    backend = FakeSpeechBackend(catalog)
+    reader = ClipboardReader(backend, CachedDetector(NgramDetector()), VoiceIndex(catalog), timings)
+    pipeline = Pipeline(reader.prepare_blocks, depth)
+    scheduler = UtteranceScheduler(pipeline.next_block, reader.speak_prepared, lookahead=lookahead, timings=reader.timings)
+    reader.on_start = scheduler.on_started
+    reader.on_finish = scheduler.on_finished
+    return backend, reader, pipeline, scheduler
+
+
+def bench_end_to_end(sizes=(100_000, 1_000_000)) -> dict:
+    """Cost of every stage for whole documents, and the overhead of reading them through the fake backend.
+    """
+    results = {}
+    for size in sizes:
+        content = mixed_language_text(size // 300)
+        stages = {}
+
+        start = time.perf_counter()
+        spans = list(iter_block_spans(content))
+        stages['segmentation'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        blocks = [clear_block(content[begin:end]) for begin, end in spans]
+        stages['cleanup'] = time.perf_counter() - start
+
+        detector = CachedDetector(NgramDetector())
+        start = time.perf_counter()
+        languages = [detector.detect(block) if has_words(block) else 'en' for block in blocks]
+        stages['detection'] = time.perf_counter() - start
+
+        index = VoiceIndex(reference_catalog())
+        start = time.perf_counter()
+        for language in languages:
+            index.select(language)
+        stages['voice_selection'] = time.perf_counter() - start
+
+        backend, reader, pipeline, scheduler = headless_app()
+        start = time.perf_counter()
+        pipeline.start(content)
+        scheduler.start()
+        backend.run_until_idle()
+        stages['read_through'] = time.perf_counter() - start
+
+        results[size] = {
+            'blocks': len(spans),
+            'spoken': len(backend.spoken),
+            'listening_time': backend.now,
+            'seconds': stages,
+            'gaps': scheduler.gap_summary(),
+            'pipeline': pipeline.metrics(),
+        }
+
+        print(f'end to end: {len(content) / 1e6:.1f} MB, {len(spans)} blocks, {backend.now / 3600:.1f} h of speech')
+        for stage, seconds in stages.items():
+            print(f'  {stage:>15}: {seconds * 1000:9.2f} ms ({seconds / len(spans) * 1e6:7.2f} us/block)')
+    return results
+
+
+def bench_coalescing():
+    """Block count and preprocessing time of line-broken text with and without coalescing.
+    """
+    paragraphs = mixed_language_text(600).split('\n\n')
+    content = '\n\n'.join(textwrap.fill(paragraph, 60) for paragraph in paragraphs)
+    target_chars = int(COALESCE_SECONDS * chars_per_second(RATE))
+    print(f'coalescing: {len(content) / 1e3:.0f} KB wrapped at 60 characters, target {target_chars} characters')
+
+    for label, by_paragraph in (('per block', False), ('runs', True)):
+        for target in (0, target_chars):
+            # uncached, so repeated lines don't hide the detection cost
+            _, reader, _, _ = headless_app()
+            reader.detector = NgramDetector()
+            start = time.perf_counter()
+            blocks = sum(1 for _ in reader.prepare_blocks(content, by_paragraph, target))
+            seconds = time.perf_counter() - start
+            print(f'  {label:>9}, {"coalesced" if target else "every line":>10}: {blocks:5} blocks, {seconds * 1000:7.2f} ms')
+
+
+def bench_block_table(size=5_000_000, seeks=1000):
+    """Memory and traversal time of a list of cleaned strings consumed with pop(0) vs. the offset-based BlockTable.
+    """
+    content = sample_text(size)
+    print(f'block table: {len(content) / 1e6:.0f} MB')
+
+    def pop_all():
+        blocks = eager_blocks(content)
+        peak = len(blocks)
+        while blocks:
+            blocks.pop(0)
+        return peak
+
+    def walk_table():
+        table = BlockTable(content, iter_flagged_spans(content))
+        for index in table.indices():
+            table.text(index)
+        return table
+
+    # tracemalloc slows allocations down, so time separately
+    blocks, _, list_peak = measure(pop_all)
+    table, _, table_peak = measure(walk_table)
+    list_s = timeit.timeit(pop_all, number=1)
+    table_s = timeit.timeit(walk_table, number=1)
+    print(f'  list + pop(0): {list_s * 1000:9.2f} ms {list_peak / 1e6:8.2f} MB peak, {blocks} blocks')
+    print(f'  block table:   {table_s * 1000:9.2f} ms {table_peak / 1e6:8.2f} MB peak, {len(table)} blocks')
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(seeks):
+        table.seek(rng.randint(-50, 50))
+        table.text(table.cursor)
+    seconds = time.perf_counter() - start
+    print(f'  seek + text:   {seconds / seeks * 1e6:9.2f} us')
+
+
+def bench_sessions(size=1_000_000, positions=10_000):
+    """First reading of a text vs. resuming its stored session: open, prepare every block, save.
+    """
+    content = mixed_language_text(size // 300)
+    settings = {'by_paragraph': False, 'target_chars': int(COALESCE_SECONDS * chars_per_second(RATE))}
+    print(f'sessions: {len(content) / 1e6:.1f} MB')
+
+    with tempfile.TemporaryDirectory() as path:
+        store = SessionStore(path)
+        for label in ('first read', 'resumed'):
+            # uncached detector, like a fresh start of the app
+            _, reader, _, _ = headless_app()
+            reader.detector = NgramDetector()
+
+            start = time.perf_counter()
+            session = store.open(content, settings, lambda: reader.block_table(content, **settings))
+            opened = time.perf_counter() - start
+            blocks = sum(1 for _ in reader.prepare_table(session.table, 0, session))
+            prepared = time.perf_counter() - start - opened
+            store.save(session)
+            saved = time.perf_counter() - start - opened - prepared
+            print(f'  {label:>10}: open {opened * 1000:8.2f} ms, prepare {blocks} blocks {prepared * 1000:8.2f} ms,'
+                  f' save {saved * 1000:7.2f} ms')
+
+        start = time.perf_counter()
+        for index in range(positions):
+            store.save_position(session, index % blocks)
+        print(f'  save position: {(time.perf_counter() - start) / positions * 1e6:.1f} us')
+
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f'  stored: {size / 1e3:.0f} KB')
+
+        # eviction keeps the store within max_bytes
+        store.max_bytes = size * 3
+        for i in range(10):
+            text = f'{i}\n\n{content}'
+            session = store.open(text, settings, lambda: reader.block_table(text, **settings))
+            len(session.table)  # split completely, like after reading to the end
+            store.save(session)
+        print(f'  after 10 more texts: {len(os.listdir(path)) // 2} sessions kept')
+
+
+def bench_clipboard_watcher(hours=1, size=1_000_000):
+    """Idle CPU cost of watch mode vs. fetching and hashing the clipboard on every poll, and debouncing of copy bursts.
+    """
+    source = FakeClipboardSource(sample_text(size))
+    print(f'clipboard watcher: {hours} h idle with {len(source.content) / 1e6:.0f} MB on the clipboard,'
+          f' polling every {WATCH_INTERVAL} s')
+
+    # the fake backend's virtual clock drives the watcher's timers
+    clock = FakeSpeechBackend()
+    texts = []
+    watcher = ClipboardWatcher(source, texts.append, WATCH_INTERVAL, WATCH_DEBOUNCE, lambda: clock.now, clock.schedule)
+    watcher.start()
+    start = time.process_time()
+    clock.advance(hours * 3600)
+    watcher_cpu = (time.process_time() - start) / watcher.polls
+
+    polls = 200
+    start = time.process_time()
+    for _ in range(polls):
+        fingerprint(source.text())
+    fetching_cpu = (time.process_time() - start) / polls
+
+    for label, cpu in (('change counter', watcher_cpu), ('fetch + hash', fetching_cpu)):
+        print(f'  {label:>14}: {cpu * 1e6:9.2f} us per poll, {cpu / WATCH_INTERVAL * 100:.4f} % CPU')
+
+    # a burst of copies is read once, after the last one
+    source.reads = 0
+    for i in range(5):
+        source.copy(f'Copy number {i}.')
+        clock.advance(0.2)
+    clock.advance(WATCH_DEBOUNCE + 2 * WATCH_INTERVAL)
+    print(f'  burst of 5 copies: {len(texts)} text read ({texts[-1] if texts else None!r}), clipboard fetched {source.reads}x')
+    watcher.stop()
+
+
+def bench_profiling(paragraphs=300, rounds=5):
+    """Overhead of the timing hooks when disabled and enabled, and the stage summary of a headless read.
+    """
+    content = mixed_language_text(paragraphs)
+    print(f'profiling: {len(content) / 1e3:.0f} KB')
+
+    for label, enabled in (('disabled', False), ('enabled', True)):
+        _, reader, _, _ = headless_app(timings=Timings(enabled=enabled))
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            blocks = sum(1 for _ in reader.prepare_blocks(content))
+            best = min(best, time.perf_counter() - start)
+        print(f'  hooks {label:>8}: {best / blocks * 1e6:6.2f} us/block prepared')
+
+    backend, reader, pipeline, scheduler = headless_app(timings=Timings(size=1 << 16, enabled=True))
+    # speaking durations in the fake backend's virtual seconds
+    scheduler.clock = lambda: backend.now
+    pipeline.start(content)
+    scheduler.start()
+    backend.run_until_idle()
+
+    for stage, summary in reader.timings.summary().items():
+        unit = 1 if stage == 'speaking' else 1e6
+        print(f'  {stage:>12}: p50 {summary["p50"] * unit:9.2f} p95 {summary["p95"] * unit:9.2f}'
+              f' {"s" if stage == "speaking" else "us"}, {summary["count"]} samples')
+    print(f'  trace: {len(reader.timings.trace())} blocks, e.g. {reader.timings.trace()[0]}')
+
+
+def bench_rate_change(words=400, taps=3, tapped_after=10.0):
+    """Time from tapping faster until the block being spoken continues at the new rate, vs. waiting for the next block.
+    """
+    # one long block, e.g. a paragraph without punctuation
+    rng = random.Random(0)
+    vocabulary = SAMPLE_PARAGRAPH.replace('.', '').replace('?', '').replace('!', '').split()
+    content = ' '.join(rng.choice(vocabulary) for _ in range(words)) + '.\n\nThe next block.'
+    block = clear_block(content.split('\n\n')[0])
+    print(f'rate change: {taps} taps {tapped_after:.0f} s into a block of {len(block)} characters')
+
+    for label, immediate in (('next block', False), ('immediate', True)):
+        for lookahead in (1, 2):
+            backend, reader, pipeline, scheduler = headless_app(lookahead=lookahead)
+            backend.start_latency = 0.05
+            changer = RateChanger(reader, scheduler, RATE_TAP_DELAY, backend.schedule)
+
+            pipeline.start(content)
+            scheduler.start()
+            backend.advance(tapped_after)
+            tapped = backend.now
+            for _ in range(taps):
+                if immediate:
+                    changer.change(reader.rate + 0.05)
+                else:
+                    reader.rate += 0.05
+                    reader.update_speed_rate()
+                backend.advance(0.1)
+            rate = reader.rate
+            backend.run_until_idle()
+
+            started, text = min((start, text) for start, _, text, _, spoken_rate in backend.spoken if spoken_rate == rate)
+            resumed = block.find(text)
+            where = f'character {resumed} of the block' if resumed >= 0 else 'the next block'
+            print(f'  {label:>10}, lookahead {lookahead}: audible after {started - tapped:6.2f} s,'
+                  f' {changer.restarts} restart(s), new rate from {where} ({text[:16]!r})')
+
+
+def bench_render(paragraphs=200, workers=(1, 2, 4, 8), realtime_factor=0.005):
+    """Throughput of rendering a document to audio with the synthetic backend across worker counts.
+    """
+    content = mixed_language_text(paragraphs)
+    print(f'render: {len(content) / 1e3:.0f} KB, synthesis {1 / realtime_factor:.0f}x faster than realtime')
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as path:
+        for count in workers:
+            _, reader, _, _ = headless_app()
+            audio = SyntheticAudioBackend(realtime_factor=realtime_factor)
+            start = time.perf_counter()
+            manifest = render_document(reader, audio, content, os.path.join(path, 'render.wav'), count)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f'  {count} worker(s): {len(content) / seconds:9.0f} characters/s, {baseline / seconds:4.1f}x,'
+                  f' {manifest["duration"] / 60:.0f} min of audio, {len(manifest["chapters"])} chapters')
+
+
+def bench_view_updates(paragraphs=100, rates=(0.3, RATE, 1.0)):
+    """UI mutations per second of direct assignments vs. the throttled ViewUpdater, with the spoken word highlighted.
+    """
+    content = mixed_language_text(paragraphs)
+    print(f'view updates: {len(content) / 1e3:.0f} KB, at most {UI_FRAMES_PER_SECOND} frames per second')
+
+    for rate in rates:
+        for label, throttled in (('direct', False), ('throttled', True)):
+            backend, reader, pipeline, scheduler = headless_app()
+            reader.rate = rate
+            view = FakeView()
+            updater = ViewUpdater(view, 1 / UI_FRAMES_PER_SECOND, backend.schedule, lambda: backend.now)
+
+            if throttled:
+                def show(block, info):
+                    updater.set('text_block', 'text', block.text)
+                    updater.set('voice', 'text', reader.who_is_speaking())
+
+                def highlight(location, length):
+                    updater.highlight('text_block', location, length)
+            else:
+                # what progress feedback costs without the updater: every update assigns the whole text
+                def show(block, info):
+                    view['text_block'].text = block.text
+                    view['voice'].text = reader.who_is_speaking()
+
+                def highlight(location, length):
+                    text = reader.current_text
+                    view['text_block'].text = f'{text[:location]}[{text[location:location + length]}]{text[location + length:]}'
+
+            scheduler.on_block = show
+            reader.on_range = highlight
+            pipeline.start(content)
+            scheduler.start()
+            backend.run_until_idle()
+
+            seconds = backend.now
+            print(f'  rate {rate:.2f} {label:>9}: {view.mutations / seconds:6.2f} mutations/s,'
+                  f' {view.characters / seconds:8.1f} characters assigned/s')
+
+    # however many updates arrive, at most one push per frame
+    clock, view = FakeSpeechBackend(), FakeView()
+    updater = ViewUpdater(view, 1 / UI_FRAMES_PER_SECOND, clock.schedule, lambda: clock.now)
+    for i in range(10_000):
+        updater.highlight('text_block', i, 3)
+        clock.advance(0.001)
+    clock.run_until_idle()
+    print(f'  1000 highlights/s for {clock.now:.0f} s: {updater.pushes / clock.now:.1f} pushes/s,'
+          f' {view.mutations / clock.now:.1f} mutations/s')
+
+
+def check_clipboard_watcher():
+    """A burst of copies is fetched and reported once, after the last copy; copying the same text again is ignored.
+    """
+    clock = FakeSpeechBackend()
+    source = FakeClipboardSource('already copied')
+    texts = []
+    watcher = ClipboardWatcher(source, texts.append, 0.5, 1.0, lambda: clock.now, clock.schedule)
+    watcher.start()
+
+    clock.advance(10)
+    assert texts == [] and source.reads == 0, 'idle polls must not fetch the clipboard'
+
+    for i in range(5):
+        source.copy(f'copy {i}')
+        clock.advance(0.2)
+    clock.advance(0.5)
+    assert texts == [], 'reported before the debounce time passed'
+    clock.advance(1.5)
+    assert texts == ['copy 4'] and source.reads == 1, (texts, source.reads)
+
+    source.copy('copy 4')
+    clock.advance(3)
+    assert texts == ['copy 4'], 'the same text copied again is reported once'
+    source.copy('another text')
+    clock.advance(3)
+    assert texts == ['copy 4', 'another text'], texts
+
+    watcher.stop()
+    source.copy('after stop')
+    clock.advance(3)
+    assert texts[-1] == 'another text', 'a stopped watcher reported a copy'
+
+
+def check_view_updates():
+    """Updates between two frames cost one assignment, and a new text drops the highlight of the previous one.
+    """
+    frames = []
+    view = FakeView()
+    updater = ViewUpdater(view, 1 / UI_FRAMES_PER_SECOND, lambda delay, callback: frames.append(callback), lambda: 0.0)
+
+    updater.set('text_block', 'text', 'First block.')
+    for location in range(0, 10, 2):
+        updater.highlight('text_block', location, 2)
+    assert len(frames) == 1, 'more than one push scheduled for a frame'
+    frames.pop()()
+    assert view.mutations == 2, view.mutations
+    assert view['text_block'].text == 'First block.' and view['text_block'].selected_range == (8, 10)
+
+    # nothing changed, nothing assigned
+    updater.set('text_block', 'text', 'First block.')
+    frames.pop()()
+    assert view.mutations == 2, view.mutations
+
+    updater.highlight('text_block', 0, 5)
+    updater.set('text_block', 'text', 'Second block.')
+    frames.pop()()
+    assert view['text_block'].text == 'Second block.'
+    assert not hasattr(view['text_block'], 'selected_range'), 'stale selection of the previous text'
+    assert ('text_block', 'selected_range') not in updater.wanted
+
+    # the same range in the new text is selected again
+    updater.highlight('text_block', 8, 2)
+    frames.pop()()
+    assert view['text_block'].selected_range == (8, 10)
+
+
+def check_detection_cache():
+    """Hits and misses of CachedDetector, one by one and batched, LRU eviction and fixed-size keys.
+    """
+    class CountingDetector(LanguageDetector):
+        def __init__(self):
+            self.texts = []
+
+        def detect(self, text):
+            self.texts.append(text)
+            return 'de' if 'der' in text.split() else 'en'
+
+    stub = CountingDetector()
+    detector = CachedDetector(stub, 3)
+    assert detector.detect('the  cat') == 'en' and detector.detect(' the cat\n') == 'en'
+    assert (detector.hits, detector.misses) == (1, 1), 'whitespace-normalized texts share an entry'
+
+    languages = detector.detect_many(['der Hund', 'the cat', 'der  Hund', 'a dog'])
+    assert languages == ['de', 'en', 'de', 'en'], languages
+    assert (detector.hits, detector.misses) == (3, 3), (detector.hits, detector.misses)
+    assert stub.texts == ['the  cat', 'der Hund', 'a dog'], 'a text repeated in a batch was detected twice'
+
+    # 'the cat' was used least recently, so it goes first
+    detector.detect('der Hund')
+    detector.detect('one more')
+    assert len(detector.cache) == 3
+    detector.detect('the cat')
+    assert stub.texts[-1] == 'the cat', 'evicted text was not detected again'
+
+    paragraph = 'a long paragraph ' * 1000
+    detector.detect(paragraph)
+    assert all(len(key) <= 32 for key in detector.cache), 'cache keys grow with the text'
+
+
+def check_segmenter(texts=2000):
+    """The lazy segmenter, flagged spans and the block table give the same blocks as re.split did (eager_blocks).
+    """
+    rng = random.Random(0)
+    pieces = ['word', 'Word', ' ', '  ', '.', '!', '?', '\n', '\n\n', ' \n \n', '-', '- ', '.12 ', '\t']
+    contents = ['', ' ', '\n\n', SAMPLE_PARAGRAPH, sample_text(5000)]
+    contents += [''.join(rng.choice(pieces) for _ in range(rng.randint(1, 40))) for _ in range(texts)]
+
+    for content in contents:
+        expected = eager_blocks(content)
+        assert list(iter_blocks(content)) == expected, content
+        assert [(start, end) for start, end, _ in iter_flagged_spans(content)] == list(iter_block_spans(content)), content
+        table = BlockTable(content, iter_flagged_spans(content))
+        assert [table.text(index) for index in table.indices()] == expected, content
+
+
+def check_sessions():
+    """Sessions store blocks, languages, voices and position, resume after a partial save and across settings.
+    """
+    content = mixed_language_text(40)
+    settings = {'by_paragraph': False, 'target_chars': 200}
+    other = dict(settings, target_chars=0)
+    _, reader, _, _ = headless_app()
+
+    with tempfile.TemporaryDirectory() as path:
+        store = SessionStore(path)
+        session = store.open(content, settings, lambda: reader.block_table(content, **settings))
+        prepared = list(reader.prepare_table(session.table, 0, session))
+        store.save(session)
+        store.save_position(session, 25)
+
+        resumed = SessionStore(path).open(content, settings, lambda: reader.block_table(content, **settings))
+        assert resumed.position == 25, resumed.position
+        assert list(resumed.table.starts) == list(session.table.starts)
+        assert [resumed.block(block.index) for block in prepared] == [(block.language, block.voice) for block in prepared]
+        again = list(reader.prepare_table(resumed.table, 0, resumed))
+        assert again == prepared, 'a resumed session prepares other blocks'
+
+        # other settings: resumes at the block containing the start of the old one
+        remapped = store.open(content, other, lambda: reader.block_table(content, **other))
+        start, position, table = session.table.starts[25], remapped.position, remapped.table
+        assert table.starts[position] <= start and not (table.fill(position + 1) and table.starts[position + 1] <= start)
+        assert position > 25, 'every line is a block of its own with the other settings'
+
+        # saved before anything was split, then a position was appended
+        text = 'First. Second. Third. Fourth.'
+        partial = store.open(text, settings, lambda: reader.block_table(text, **settings))
+        store.save(partial)
+        store.save_position(partial, 2)
+        assert store.open(text, other, lambda: reader.block_table(text, **other)).position == 0
+
+        # saved after a few blocks were split: the rest is split again when it's read
+        text = '\n\n'.join(f'Paragraph {i}.' for i in range(500))
+        partial = store.open(text, settings, lambda: reader.block_table(text, **settings))
+        partial.table.fill(10)
+        store.save(partial)
+        store.save_position(partial, 5)
+        reopened = store.open(text, settings, lambda: reader.block_table(text, **settings))
+        assert reopened.position == 5 and len(reopened.table) == 500
+
+
+def check_coalescing():
+    """Line-broken blocks are merged within one language only, with and without language runs.
+    """
+    by_language = {}
+    for language, text in LABELED_SAMPLES:
+        by_language.setdefault(language, []).append(text.rstrip('.?!'))
+    lines = by_language['en'][:2] + by_language['de'][:2] + by_language['fr'][:1] + by_language['en'][2:]
+    content = '\n'.join(lines) + '\n\n' + '\n'.join(by_language['es'])
+    _, reader, _, _ = headless_app()
+
+    blocks = list(reader.prepare_blocks(content, False, 1000))
+    assert [block.language for block in blocks] == ['en', 'de', 'fr', 'en', 'es'], [block.language for block in blocks]
+    assert blocks[0].text == '\n'.join(by_language['en'][:2]), 'lines of one language were not merged'
+
+    # runs change languages only between paragraphs, so each paragraph is a block
+    blocks = list(reader.prepare_blocks(content, True, 1000))
+    assert len(blocks) == 2 and blocks[1].language == 'es', [block.language for block in blocks]
+
+    # every line a block of its own, as without coalescing
+    assert len(list(reader.prepare_blocks(content, False, 10))) == len(lines) + len(by_language['es'])
+
+
+BENCHMARKS = {
+    'segmenter': bench_segmenter,
+    'scheduler': bench_scheduler,
+    'voices': bench_voices,
+    'detection_cache': bench_detection_cache,
+    'ngram_detector': bench_ngram_detector,
+    'language_runs': bench_language_runs,
+    'pipeline': bench_pipeline,
+    'coalescing': bench_coalescing,
+    'block_table': bench_block_table,
+    'sessions': bench_sessions,
+    'clipboard_watcher': bench_clipboard_watcher,
+    'profiling': bench_profiling,
+    'rate_change': bench_rate_change,
+    'render': bench_render,
+    'view_updates': bench_view_updates,
+    'end_to_end': bench_end_to_end,
+}
+
+CHECKS = {
+    'clipboard_watcher': check_clipboard_watcher,
+    'view_updates': check_view_updates,
+    'detection_cache': check_detection_cache,
+    'segmenter': check_segmenter,
+    'sessions': check_sessions,
+    'coalescing': check_coalescing,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', help=f'benchmarks to run, default: all of {", ".join(BENCHMARKS)}')
+    parser.add_argument('--json', help='write the results of benchmarks that return any to this file')
+    parser.add_argument('--check', action='store_true', help=f'run checks instead, default: all of {", ".join(CHECKS)}')
+    args = parser.parse_args()
+
+    unknown = set(args.benchmarks) - set(CHECKS if args.check else BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown {"checks" if args.check else "benchmarks"}: {", ".join(sorted(unknown))}')
+
+    if args.check:
+        for name in args.benchmarks or CHECKS:
+            CHECKS[name]()
+            print(f'{name}: ok')
+        raise SystemExit
+
+    results = {}
+    for name in args.benchmarks or BENCHMARKS:
+        result = BENCHMARKS[name]()
+        if result is not None:
+            results[name] = result
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
@@ -1,50 +1,82 @@
-import re
-from objc_util import ObjCClass, ns, create_objc_class
-from preferences import RATE, VOICE_PREFERENCES
+from itertools import islice
+
+from language_detection import CachedDetector, TaggerDetector, has_words
+from language_runs import LanguageRuns, LineLanguages
+from ngram_detector import NgramDetector
+from pipeline import PreparedBlock
+from preferences import DETECTION_BATCH, DETECTION_CACHE_SIZE, DETECTION_ENGINE, PROFILE_SAMPLES, PROFILING, RATE
+from profiling import Timings
+from segmenter import BlockTable, coalesce_spans, iter_flagged_spans
+from voices import load_voice_index
 
 
 class ClipboardReader:
-    def __init__(self):
-        self.voices = list(ObjCClass('AVSpeechSynthesisVoice').speechVoices())
+    def __init__(self, backend=None, detector=None, voice_index=None, timings=None):
+        """
+        backend: SpeechBackend, by default iOS' speech synthesizer (ObjCSpeechBackend)
+        detector: LanguageDetector, by default chosen by DETECTION_ENGINE and cached
+        voice_index: VoiceIndex, by default built from the cached voice catalog
+        timings: Timings recording the stages of every block, by default enabled by PROFILING
+        """
+        if backend is None:
+            from speech_backend import ObjCSpeechBackend
+            backend = ObjCSpeechBackend()
+        self.backend = backend
+        
+        if detector is None:
+            engine = NgramDetector() if DETECTION_ENGINE == 'ngram' else TaggerDetector()
+            detector = CachedDetector(engine, DETECTION_CACHE_SIZE)
+        self.detector = detector
+        
+        if voice_index is None:
+            voice_index = load_voice_index(list_voices=backend.list_voices, on_update=self.set_voice_index)
+        self.voice_index = voice_index
+        self.timings = timings or Timings(PROFILE_SAMPLES, PROFILING)
+        
         self.rate = RATE
         self.language = None
         self.name = None
         self.id = None
         self.current_text = ''
-        self.busy = False
+        self.offset = 0  # start of the word being spoken in the current utterance
         
-        self.SYNTHESIZER = ObjCClass('AVSpeechSynthesizer').alloc().init()
-        self.UTTERANCE = None
+        # optional callbacks for the synthesizer's didStart and didFinish events, e.g. a scheduler
+        self.on_start = None
+        self.on_finish = None
+        # optional callback(location, length) before each word of the current utterance
+        self.on_range = None
         
         self.setup_delegate()
         
     def setup_delegate(self):
-        """Helper to use ObjC's speech synthesizer's didFinish-method. When reader is finished reading its status changes to 'not busy'.
+        """Helper to use the speech synthesizer's didStart-, didFinish- and willSpeakRange-callbacks.
         
-        Why not simply use self.SYNTHESIZER.isSpeaking()?
-        The busy state includes preprocessing i.e. getting the dominant language and a voice.
+        The callbacks are forwarded to self.on_start, self.on_finish and self.on_range, so the next block can be
+        scheduled without polling. The range callback also tracks the word being spoken (see remainder).
         """
         
+        def on_speech_started():
+            self.offset = 0
+            if self.on_start:
+                self.on_start()
+        
         def on_speech_finished():
-            """Helper function to avoid ObjectC's Key Value Coding Error. Delegate doesn't support direct access to python attributes and throws an error ("this class is not key value coding-compliant for the key 'busy'").
-            """
-            self.busy = False
-            
-        def speechSynthesizer_didFinishSpeechUtterance_(_self, _cmd, synthesizer, utterance):
-            on_speech_finished()
+            if self.on_finish:
+                self.on_finish()
         
-        DelegateClass = create_objc_class(
-            'SpeechSynthDelegate',
-            methods=[speechSynthesizer_didFinishSpeechUtterance_],
-            protocols=['AVSpeechSynthesizerDelegate']
-        )
+        def on_speech_range(location, length):
+            self.offset = location
+            if self.on_range:
+                self.on_range(location, length)
         
-        self.delegate = DelegateClass.alloc().init()
+        self.backend.on_start = on_speech_started
+        self.backend.on_finish = on_speech_finished
+        self.backend.on_range = on_speech_range
         
-        try:
-            self.SYNTHESIZER.setDelegate_(self.delegate)
-        except Exception as e:
-            print(f"Error setting delegate: {e}")
+    def set_voice_index(self, voice_index):
+        """Replace the voice index, e.g. after the installed voices changed.
+        """
+        self.voice_index = voice_index
         
     def who_is_speaking(self):
         """Return name and language of current voice.
@@ -55,80 +87,148 @@ class ClipboardReader:
         """Checks if the block contains no valid words.
         A valid word is defined as having at least two consecutive Unicode letters.
         """
-        return not bool(re.search(r'[^\W\d_]{2,}', block))
+        return not has_words(block)
         
-    def detect_language(self, text: str) -> str:
-        """Detect dominant language of a given Text.
+    def detect_language(self, text: str, fallback=None, index=None) -> str:
+        """Detect dominant language of a given Text. Detection is done (and cached) by self.detector.
+        index is the block the detection time is recorded for.
         """
         
-        # If text block includes no words objC cannot detect language. Use previously detected language or english as fallback.
+        # If text block includes no words objC cannot detect language. Use given or previously detected language or english as fallback.
         if self.block_has_no_words(text):
-            fallback = self.language or 'en'
+            fallback = fallback or self.language or 'en'
             return fallback
                 
-        string = ObjCClass('NSString').stringWithString_(text)
-        tagger = ObjCClass('NSLinguisticTagger').alloc().initWithTagSchemes_options_(['Language'], 0)
-        tagger.setString_(string)
-        detected_language = tagger.dominantLanguage()
-        lng = str(detected_language)
+        started = self.timings.start()
+        language = self.detector.detect(text)
+        self.timings.stop('detect', started, index)
+        return language
         
-        return lng
+    def language_runs(self, content: str) -> LanguageRuns:
+        """Tag the languages of a whole text paragraph by paragraph, see LanguageRuns.
+        """
+        return LanguageRuns(content, self.detector.detect, fallback=self.language or 'en')
         
-    def speak_with_voice(self, text):
+    def speak_with_voice(self, text, rate=None):
         """Replacement for speech.say() that also allows to choose a specific voice.
         """
         # change state
-        self.busy = True 
-        
-        # create new UTTERANCE
-        self.UTTERANCE = ObjCClass('AVSpeechUtterance').alloc().initWithString_(ns(text))
-        self.current_text = str(self.UTTERANCE.valueForKey_("speechString"))
-        
-        # set params
-        voice = ObjCClass('AVSpeechSynthesisVoice').voiceWithIdentifier_(
-            ns(self.id))
-        self.UTTERANCE.setVoice_(voice)
-        self.update_speed_rate()
+        self.current_text = text
         
         # speak
-        self.SYNTHESIZER.speakUtterance_(self.UTTERANCE)
+        rate = self.rate if rate is None else rate
+        self.backend.speak(text, self.id, max(0, min(rate, 1)))
         
-    def read_loud(self, content: str) -> None:
-        """ Read given text. The dominant language will be determined to pick a suitable voice.
-        If a suitable voice's name is in VOICE_PREFERENCES this voice will read the text. 
+    def prepare(self, content: str, language=None, fallback=None, index=None) -> PreparedBlock:
+        """Determine language and voice for a block without speaking it. Safe to call from a worker thread.
+        Unless a language is given the dominant language will be determined, fallback is used for blocks without words.
         """
-        self.busy = True
-        lng = self.detect_language(content)
+        lng = language or self.detect_language(content, fallback, index)
         
-        for voice in self.voices:
-            
-            # filter by language
-            language = str(voice.language()) 
-            if not language.startswith(lng):
-                continue
+        # preferences are already applied to the index' ranking
+        started = self.timings.start()
+        voice = self.voice_index.select(lng)
+        self.timings.stop('voice', started, index)
+        return PreparedBlock(content, lng, voice, None, index)
+        
+    def speak_prepared(self, block: PreparedBlock) -> None:
+        """Speak a prepared block with its voice. Without a voice the previous one is used.
+        """
+        if block.voice:
+            self.name = block.voice['name']
+            self.language = block.voice['language']
+            self.id = block.voice['identifier']
                 
-            self.name = str(voice.name())
-            self.language = language
-            self.id = str(voice.identifier())  
+        started = self.timings.start()
+        self.speak_with_voice(block.text, block.rate)
+        self.timings.stop('speak', started, block.index)
+        
+    def block_table(self, content: str, by_paragraph=False, target_chars=0) -> BlockTable:
+        """Split content into sentences lazily, see segmenter.BlockTable.
+        With by_paragraph languages come from paragraph runs instead of every single block.
+        With target_chars line-broken blocks of a paragraph and language are merged up to this length (see segmenter.coalesce_spans).
+        """
+        runs = self.language_runs(content) if by_paragraph else None
+        
+        spans = iter_flagged_spans(content)
+        if target_chars:
+            # lines are only merged within one language: without runs every line that could be merged is detected
+            if runs is None:
+                runs = LineLanguages(content, self.detector.detect)
+            spans = coalesce_spans(spans, target_chars, language_of=runs.language_of)
+        
+        return BlockTable(content, spans, runs)
+        
+    def prepare_table(self, table: BlockTable, first=0, session=None, batch=DETECTION_BATCH):
+        """Clean up the blocks of table from index first on, detect their language and pick a voice. Yields PreparedBlocks lazily.
+        With a ReadingSession blocks prepared before keep their language and voice, new ones are recorded.
+        Languages are detected batch blocks at a time with detector.detect_many. The first block is prepared alone,
+        so reading starts without waiting for a whole batch.
+        """
+        timings = self.timings
+        indices = table.indices(first)
+        language = None
+        size = 1
+        while True:
+            chunk = list(islice(indices, size))
+            if not chunk:
+                return
+            size = max(1, batch)
             
-            # stop at first voice preference
-            if self.name in VOICE_PREFERENCES:
-                break
-                
-        self.speak_with_voice(content)
+            texts = {}
+            for index in chunk:
+                started = timings.start()
+                texts[index] = table.text(index)
+                timings.stop('clear_block', started, index)
+            
+            # blocks neither known from the session nor covered by a language run, and with words to detect
+            known = {index: session.block(index) for index in chunk} if session else {}
+            detect = [index for index in chunk if not known.get(index) and table.language(index) is None and has_words(texts[index])]
+            detected = {}
+            if detect:
+                started = timings.start()
+                detected = dict(zip(detect, self.detector.detect_many([texts[index] for index in detect])))
+                timings.stop('detect_batch', started, detect[0])
+            
+            for index in chunk:
+                if known.get(index):
+                    block = PreparedBlock(texts[index], known[index][0], known[index][1], None, index)
+                else:
+                    lng = table.language(index) or detected.get(index)
+                    block = self.prepare(texts[index], language=lng, fallback=language, index=index)
+                    if session:
+                        session.record(index, block.language, block.voice)
+                language = block.language
+                yield block
+        
+    def prepare_blocks(self, content: str, by_paragraph=False, target_chars=0):
+        """Split content into sentences, clean them up, detect their language and pick a voice. Yields PreparedBlocks lazily.
+        See block_table() for by_paragraph and target_chars.
+        """
+        return self.prepare_table(self.block_table(content, by_paragraph, target_chars))
         
     def is_speaking(self):
-        return self.SYNTHESIZER.isSpeaking()
+        return self.backend.is_speaking()
         
     def stop_speaking(self):
         """Stops the speech synthesizer if it is currently speaking.
         """
         if self.is_speaking():
-            self.SYNTHESIZER.stopSpeakingAtBoundary_(0)  # 0 steht für AVSpeechBoundaryImmediate
+            self.backend.stop()
             
-    def update_speed_rate(self):
-        """Set voices speed to self.rate, a value from 0 to 1.
-        Updates apply to the next block.
+    def remainder(self, block: PreparedBlock):
+        """Return the part of block that wasn't spoken yet, starting with the word being spoken, or None if only
+        whitespace is left. block has to be the block being spoken. The remainder is spoken at the current rate.
+        """
+        text = block.text[self.offset:]
+        if not text.strip():
+            return None
+        return block._replace(text=text, rate=None)
+        
+    def update_speed_rate(self, rate=None):
+        """Set voices speed to rate or self.rate, a value from 0 to 1.
+        Updates apply to the next block, see rate_control.RateChanger to change the rate of the current block.
         """
-        self.UTTERANCE.setRate_(max(0, min(self.rate, 1)))
+        rate = self.rate if rate is None else rate
+        self.backend.update_rate(max(0, min(rate, 1)))
         
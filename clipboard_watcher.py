@@ -0,0 +1,118 @@
+import hashlib
+import threading
+import time
+
+
+class PasteboardSource:
+    """The system clipboard. Only available in Pythonista.
+
+    UIPasteboard's changeCount goes up with every copy, so checking for changes doesn't copy the text.
+    """
+    def __init__(self):
+        from objc_util import ObjCClass
+        self.pasteboard = ObjCClass('UIPasteboard').generalPasteboard()
+
+    def change_count(self) -> int:
+        return int(self.pasteboard.changeCount())
+
+    def text(self):
+        import clipboard
+        return clipboard.get()
+
+
+class FakeClipboardSource:
+    """Stand-in for the clipboard, e.g. for benchmarks. copy() works like copying text on the device.
+    """
+    def __init__(self, text=''):
+        self.content = text
+        self.changes = 0
+        self.reads = 0  # number of times the text was fetched
+
+    def copy(self, text):
+        self.content = text
+        self.changes += 1
+
+    def change_count(self) -> int:
+        return self.changes
+
+    def text(self):
+        self.reads += 1
+        return self.content
+
+
+def fingerprint(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def start_timer(delay: float, callback):
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+
+class ClipboardWatcher:
+    """Polls a clipboard source for newly copied text.
+
+    A poll only compares the source's change counter. Once it changed, the watcher waits until there was no
+    further copy for debounce seconds, so only the last of a burst of copies is fetched. on_text(text) is
+    called if that text differs from the one reported before (copying the same text twice is ignored).
+    """
+    def __init__(self, source, on_text, interval=0.5, debounce=1.0, clock=time.monotonic, schedule=start_timer):
+        """
+        schedule: callable(delay, callback) running callback after delay seconds, by default a thread timer
+        """
+        self.source = source
+        self.on_text = on_text
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self.schedule = schedule
+
+        self.running = False
+        self.generation = 0  # bumped by stop() so timers of a stopped watcher do nothing
+        self.count = source.change_count()
+        self.changed_at = None  # time of the latest copy that wasn't reported yet
+        self.last = None  # fingerprint of the text reported last
+        self.polls = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.generation += 1
+        self.count = self.source.change_count()
+        self.changed_at = None
+        self.tick(self.generation)
+
+    def stop(self):
+        self.running = False
+        self.generation += 1
+
+    def tick(self, generation):
+        if not self.running or generation != self.generation:
+            return
+        self.poll()
+        self.schedule(self.interval, lambda: self.tick(generation))
+
+    def poll(self):
+        """Check the change counter and report the copied text once the debounce time passed.
+        """
+        self.polls += 1
+        count = self.source.change_count()
+        if count != self.count:
+            self.count = count
+            self.changed_at = self.clock()
+            return
+
+        if self.changed_at is None or self.clock() - self.changed_at < self.debounce:
+            return
+
+        self.changed_at = None
+        text = self.source.text()
+        if not text or not isinstance(text, str):
+            return
+
+        key = fingerprint(text)
+        if key != self.last:
+            self.last = key
+            self.on_text(text)
@@ -0,0 +1,116 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+# a valid word has at least two consecutive Unicode letters
+WORD_PATTERN = re.compile(r'[^\W\d_]{2,}')
+
+
+def has_words(text: str) -> bool:
+    """Checks if the text contains at least one valid word.
+    """
+    return WORD_PATTERN.search(text) is not None
+
+
+class LanguageDetector:
+    """Interface of all language detectors: detect() returns the dominant language code of a text, e.g. 'en' or 'de'.
+    """
+    def detect(self, text: str) -> str:
+        raise NotImplementedError
+
+    def detect_many(self, texts) -> list:
+        """Detect the languages of many texts at once. Detectors that can batch, e.g. NgramDetector, override this.
+        """
+        return [self.detect(text) for text in texts]
+
+
+class TaggerDetector(LanguageDetector):
+    """Detects languages with ObjC's NSLinguisticTagger. One tagger is reused for all texts.
+    """
+    def __init__(self):
+        self.tagger = None
+
+    def detect(self, text: str) -> str:
+        if self.tagger is None:
+            from objc_util import ObjCClass
+            self.tagger = ObjCClass('NSLinguisticTagger').alloc().initWithTagSchemes_options_(['Language'], 0)
+
+        from objc_util import ns
+        self.tagger.setString_(ns(text))
+        return str(self.tagger.dominantLanguage())
+
+
+class CachedDetector(LanguageDetector):
+    """Wraps another detector with a bounded LRU cache keyed by a digest of the whitespace-normalized text.
+    Repeated headings, bullets and re-reads of the same clipboard are only detected once. Keys have a fixed size,
+    so caching whole paragraphs (see LanguageRuns) doesn't keep a second copy of the text.
+    """
+    def __init__(self, detector: LanguageDetector, maxsize=512):
+        self.detector = detector
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(text.split())
+
+    @classmethod
+    def key(cls, text: str) -> bytes:
+        return hashlib.blake2b(cls.normalize(text).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def detect(self, text: str) -> str:
+        key = self.key(text)
+        try:
+            language = self.cache[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return language
+
+        self.misses += 1
+        language = self.detector.detect(text)
+        if self.maxsize > 0:
+            self.cache[key] = language
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return language
+
+    def detect_many(self, texts) -> list:
+        """Detect many texts at once. Cached texts are looked up, all others are passed to the wrapped detector in
+        one batch, repeated ones only once.
+        """
+        keys = [self.key(text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}  # key: positions of texts not in the cache
+        for position, key in enumerate(keys):
+            language = self.cache.get(key)
+            if language is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                results[position] = language
+            elif key in missing:
+                self.hits += 1
+                missing[key].append(position)
+            else:
+                self.misses += 1
+                missing[key] = [position]
+
+        if missing:
+            detected = self.detector.detect_many([texts[positions[0]] for positions in missing.values()])
+            for (key, positions), language in zip(missing.items(), detected):
+                for position in positions:
+                    results[position] = language
+                if self.maxsize > 0:
+                    self.cache[key] = language
+                    if len(self.cache) > self.maxsize:
+                        self.cache.popitem(last=False)
+        return results
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
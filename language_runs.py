@@ -0,0 +1,146 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+from language_detection import has_words
+from segmenter import clear_block, iter_spans
+
+PARAGRAPH_PATTERN = re.compile(r'\n\s*\n')
+
+# paragraphs shorter than this inherit the language of the previous paragraph instead of being detected
+MIN_CHARS = 40
+
+
+class LanguageRuns:
+    """Contiguous runs of one language over a whole text, tagged paragraph by paragraph as reading proceeds.
+
+    Each paragraph is detected once, so the voice only changes at paragraph boundaries. Paragraphs that are
+    short or have no words (headings, bullets, numbers) inherit the language of the previous paragraph.
+    Short paragraphs at the very beginning take the language of the first paragraph that can be detected.
+    """
+    def __init__(self, content: str, detect, fallback='en', min_chars=MIN_CHARS):
+        """
+        detect: callable returning the language of a text, e.g. LanguageDetector.detect
+        fallback: language if no paragraph has any words
+        """
+        self.content = content
+        self.detect = detect
+        self.fallback = fallback
+        self.min_chars = min_chars
+
+        self.paragraphs = iter_spans(content, PARAGRAPH_PATTERN)
+        self.starts = []  # start offset of each run
+        self.languages = []  # language of each run
+        self.end = 0  # offsets below end are tagged
+        self.pending = []  # leading paragraphs waiting for a language
+        self.detections = 0
+
+    def add(self, start: int, language: str):
+        if self.languages and self.languages[-1] == language:
+            return
+        # the first run starts at offset 0 so that leading whitespace belongs to a run, too
+        self.starts.append(start if self.starts else 0)
+        self.languages.append(language)
+
+    def detect_paragraph(self, text: str) -> str:
+        self.detections += 1
+        return self.detect(text)
+
+    def tag_next(self) -> bool:
+        """Tag the next paragraph. Returns False if the whole text is tagged.
+        """
+        span = next(self.paragraphs, None)
+        if span is None:
+            if self.pending:
+                # only short paragraphs: detect them together
+                text = ' '.join(self.content[start:end] for start, end in self.pending)
+                language = self.detect_paragraph(text) if has_words(text) else self.fallback
+                self.add(self.pending[0][0], language)
+                self.pending = []
+            self.end = len(self.content)
+            return False
+
+        start, end = span
+        text = self.content[start:end]
+        if len(text) >= self.min_chars and has_words(text):
+            language = self.detect_paragraph(text)
+            if self.pending:
+                start = self.pending[0][0]
+                self.pending = []
+            self.add(start, language)
+        elif self.languages:
+            # short or without words: keep the current language
+            pass
+        else:
+            self.pending.append(span)
+            return True
+
+        self.end = end
+        return True
+
+    def language_at(self, offset: int) -> str:
+        """Return the language of the run containing offset. Tags paragraphs until offset is covered.
+        """
+        while self.end <= offset and self.tag_next():
+            pass
+
+        if not self.languages:
+            return self.fallback
+        return self.languages[max(0, bisect_right(self.starts, offset) - 1)]
+
+    def language_of(self, start: int, end: int) -> str:
+        """Return the language of the span start:end, i.e. of its run, see segmenter.coalesce_spans.
+        """
+        return self.language_at(start)
+
+    def runs(self) -> list:
+        """Tag the whole text and return (start, end, language) tuples of all runs.
+        """
+        while self.tag_next():
+            pass
+        ends = self.starts[1:] + [len(self.content)]
+        return list(zip(self.starts, ends, self.languages))
+
+
+class LineLanguages:
+    """Languages of single lines, detected while line-broken blocks are merged without language runs.
+
+    segmenter.coalesce_spans asks language_of() for every line it could merge, so lines of different languages
+    stay apart. Merged blocks are of one language, language_at() returns it for the block's first line, so the
+    block isn't detected again. Lines that weren't detected have no language (None). Starts are kept in an array,
+    since lines are detected in order.
+    """
+    def __init__(self, content: str, detect):
+        """
+        detect: callable returning the language of a text, e.g. LanguageDetector.detect
+        """
+        self.content = content
+        self.detect = detect
+        self.starts = array('q')  # start offset of each detected line
+        self.codes = array('h')  # language of each detected line, index into languages
+        self.languages = []
+        self.detections = 0
+
+    def language_of(self, start: int, end: int):
+        """Detect the language of the line start:end, None if it has no words.
+        """
+        text = clear_block(self.content[start:end])
+        if not has_words(text):
+            return None
+
+        self.detections += 1
+        language = self.detect(text)
+        if language not in self.languages:
+            self.languages.append(language)
+        if not self.starts or self.starts[-1] < start:
+            self.starts.append(start)
+            self.codes.append(self.languages.index(language))
+        return language
+
+    def language_at(self, offset: int):
+        """Return the language of the line starting at offset or None if it wasn't detected.
+        """
+        i = bisect_left(self.starts, offset)
+        if i < len(self.starts) and self.starts[i] == offset:
+            return self.languages[self.codes[i]]
+        return None
@@ -1,8 +1,18 @@
-import re
+import threading
+from collections import deque
+
 import ui
 import clipboard
 
 from clipboard_reader import ClipboardReader
+from clipboard_watcher import ClipboardWatcher, PasteboardSource
+from pipeline import Pipeline
+from preferences import COALESCE_SECONDS, DETECTION_ENGINE, DETECTION_MODE, LOOKAHEAD, PIPELINE_DEPTH, RATE, UI_FRAMES_PER_SECOND, WATCH_CLIPBOARD, WATCH_DEBOUNCE, WATCH_INTERVAL
+from rate_control import RateChanger
+from scheduler import UtteranceScheduler
+from sessions import SessionStore
+from speech_backend import chars_per_second
+from view_updates import ViewUpdater
 
 
 class ClipboardReaderApp:
@@ -11,57 +21,192 @@ class ClipboardReaderApp:
         self.view = ui.load_view('clipboard_reader_ui.pyui')
         self.view.name = 'Clipboard Reader'
         self.view.present('sheet')
-        self.blocks = []
+        self.content = ''
+        self.table = None
+        self.sessions = SessionStore()
+        self.session = None
+        self.watcher = None
+        self.waiting = deque()  # texts copied while watching, read after the current one
+        self.watched = ''  # text copied last while watching
         self.btn_alpha = (1, 0.5)
         
+        # display updates are pushed at most UI_FRAMES_PER_SECOND times a second, on the main thread
+        self.updater = ViewUpdater(self.view, 1 / UI_FRAMES_PER_SECOND, schedule=lambda delay, callback: ui.delay(callback, delay))
+        self.updater.set('btn_watch', 'alpha', self.btn_alpha[1])  # watch mode is off
+        
+        # blocks are prepared by a worker thread, playback only takes them from its queue without waiting:
+        # if a block isn't ready yet, the worker asks the scheduler again on the main thread once it is
+        self.pipeline = Pipeline(self.prepare_blocks, PIPELINE_DEPTH, on_ready=lambda: ui.delay(self.scheduler.fill, 0))
+        self.scheduler = UtteranceScheduler(
+            next_block=self.pipeline.next_block,
+            speak=self.speak_block,
+            on_block=self.show_block,
+            on_done=self.finished_reading,
+            lookahead=LOOKAHEAD,
+            timings=self.cr.timings
+        )
+        self.cr.on_start = self.scheduler.on_started
+        self.cr.on_finish = self.scheduler.on_finished
+        self.cr.on_range = self.highlight_word
+        
+        # rate changes restart the current block, ui.delay runs the restart on the main thread like the delegate callbacks
+        self.rate_changer = RateChanger(self.cr, self.scheduler, schedule=lambda delay, callback: ui.delay(callback, delay))
+        
     def faster(self, sender):
-        self.cr.rate = min(1, self.cr.rate + 1/100)
-        self.view['btn_fast'].alpha = self.btn_alpha[self.cr.rate == 1]
-        self.cr.update_speed_rate()
+        self.rate_changer.change(self.cr.rate + 1/100)
+        self.updater.set('btn_fast', 'alpha', self.btn_alpha[self.cr.rate == 1])
         
     def slower(self, sender):
-        self.cr.rate = max(0, self.cr.rate - 1/100)
-        self.view['btn_fast'].alpha = self.btn_alpha[self.cr.rate == 0]
-        self.cr.update_speed_rate()
+        self.rate_changer.change(self.cr.rate - 1/100)
+        self.updater.set('btn_fast', 'alpha', self.btn_alpha[self.cr.rate == 0])
         
     def read_clipboard(self, sender=None):
-        if self.get_text_from_clipboard():
-            self.read_next_block()
+        started = self.cr.timings.start()
+        found = self.get_text_from_clipboard()
+        self.cr.timings.stop('clipboard', started)
+        if found:
+            self.read_text(self.content)
+            
+    def read_text(self, content):
+        """Stop reading and read content instead.
+        """
+        self.content = content
+        self.scheduler.stop()
+        self.cr.stop_speaking()
+        self.pipeline.cancel()
+        self.save_session()
+        
+        # a text read before resumes at its last block without being split and detected again.
+        # Block length follows the preferred RATE, not the live rate, so faster/slower taps keep the session valid.
+        # Languages stored by another detection engine aren't reused.
+        settings = {
+            'by_paragraph': DETECTION_MODE == 'document',
+            'target_chars': int(COALESCE_SECONDS * chars_per_second(RATE)),
+        }
+        started = self.cr.timings.start()
+        self.session = self.sessions.open(content, dict(settings, engine=DETECTION_ENGINE), lambda: self.cr.block_table(content, **settings))
+        self.cr.timings.stop('open_session', started)
+        self.table = self.session.table
+        self.table.cursor = self.session.position
+        self.pipeline.start(self.table)
+        self.scheduler.start()
         
-    def read_next_block(self):
-        """Recursively reads all blocks. 
+        # store a new session right away, the app may be closed without stopping; only blocks split so far are written
+        threading.Thread(target=self.save_session, daemon=True).start()
         
-            Why not a for-loop?
-            ui only updates once after the function is finished. With recursion it updates with every block. With a for-loop view'd update after the last block
+    def watch_clipboard(self, sender=None):
+        """Switch watch mode on or off. While watching, newly copied text is read after the current text.
         """
-        if self.blocks == []:
-            # case: nothing to read
+        if self.watcher is None:
+            # polls run on the main thread like the delegate callbacks, so queue_text never races finished_reading
+            self.watcher = ClipboardWatcher(
+                PasteboardSource(), self.queue_text, WATCH_INTERVAL, WATCH_DEBOUNCE,
+                schedule=lambda delay, callback: ui.delay(callback, delay)
+            )
+        
+        if self.watcher.running:
+            self.watcher.stop()
+        else:
+            self.watched = ''
+            self.watcher.start()
+        self.updater.set('btn_watch', 'alpha', self.btn_alpha[not self.watcher.running])
+            
+    def queue_text(self, text):
+        """Called by the watcher with newly copied text. Reads it right away or after the current text.
+        If the text continues the one copied before, e.g. a growing selection, only the new part is queued.
+        """
+        previous, self.watched = self.watched, text
+        if previous and text.startswith(previous):
+            text = text[len(previous):]
+        if not text.strip():
             return
+        
+        if self.scheduler.running:
+            self.waiting.append(text)
+        else:
+            self.read_text(text)
             
-        if not self.cr.busy:
-            # case: ready to read 
-            self.current_block = self.blocks.pop(0)
-            self.cr.read_loud(self.current_block)
-            self.display_speaker()
-            self.display_block()
-        
-        # wait and retry
-        ui.delay(self.read_next_block, 1)
-        
-    def display_block(self):
-        """Update Text View element with current text from clipboard reader.
+    def save_session(self):
+        """Store the current session's blocks, languages and voices, see sessions.SessionStore.
+        """
+        if self.session is not None:
+            self.sessions.save(self.session)
+            
+    def seek(self, delta: int):
+        """Continue reading delta blocks after (or before if negative) the current block.
+        Blocks are offsets into the text, so nothing has to be split again.
+        """
+        if self.table is None:
+            return
+        self.scheduler.stop()
+        self.cr.stop_speaking()
+        self.table.seek(delta)
+        self.pipeline.start(self.table)
+        self.scheduler.start()
+        
+    def skip_forward(self, sender):
+        self.seek(1)
+        
+    def skip_back(self, sender):
+        self.seek(-1)
+        
+    def speak_block(self, block):
+        """Start speaking block (or queue it with the synthesizer). Returns the text and speaker to display once it starts.
+        """
+        self.cr.speak_prepared(block)
+        return self.cr.current_text, self.cr.who_is_speaking()
+        
+    def show_block(self, block, info):
+        """Called by the scheduler when the synthesizer starts speaking a prepared block.
         """
-        self.view['text_block'].text = self.cr.current_text
+        self.current_block = block
+        self.table.cursor = block.index
+        self.sessions.save_position(self.session, block.index)
+        self.display_speaker(info[1])
+        self.display_block(info[0])
         
-    def display_speaker(self):
-        """Update Label element with current voice's name and language from clipboard reader.
+    def finished_reading(self):
+        """Called by the scheduler after the last block. The next reading of this text starts from the beginning.
         """
-        self.view['voice'].text = self.cr.who_is_speaking()
+        self.sessions.save_position(self.session, 0)
+        self.save_session()
+        self.report_timing()
+        if self.waiting:
+            self.read_text(self.waiting.popleft())
+        
+    def report_timing(self):
+        """Print how long the silences between blocks were and how often playback waited for the pipeline.
+        """
+        gaps = self.scheduler.gap_summary()
+        print(f"{gaps['count']} gaps between blocks, mean {gaps['mean'] * 1000:.0f} ms, max {gaps['max'] * 1000:.0f} ms")
+        queue = self.pipeline.metrics()
+        print(f"pipeline: mean queue depth {queue['mean_depth']:.1f}, {queue['stalls']} stalls, {queue['stall_time'] * 1000:.0f} ms waiting")
+        
+        timings = self.cr.timings
+        if timings.enabled:
+            for stage, summary in timings.summary().items():
+                print(f"{stage}: p50 {summary['p50'] * 1000:.2f} ms, p95 {summary['p95'] * 1000:.2f} ms, {summary['count']} samples")
+            timings.export()
+        
+    def display_block(self, text=None):
+        """Update Text View element with given text or current text from clipboard reader.
+        """
+        self.updater.set('text_block', 'text', self.cr.current_text if text is None else text)
+        
+    def highlight_word(self, location, length):
+        """Select the word being spoken in the Text View element.
+        """
+        self.updater.highlight('text_block', location, length)
+        
+    def display_speaker(self, speaker=None):
+        """Update Label element with given speaker or current voice's name and language from clipboard reader.
+        """
+        self.updater.set('voice', 'text', self.cr.who_is_speaking() if speaker is None else speaker)
         
     def get_text_from_clipboard(self) -> bool:
-        """Fetch text string from clipboard. Split into sentences, save as list in self.blocks and return True.
+        """Fetch text string from clipboard, save it in self.content and return True.
         """
-        self.blocks = []
+        self.content = ''
         content = clipboard.get()
         
         if not content:
@@ -69,34 +214,32 @@ class ClipboardReaderApp:
         elif not isinstance(content, str):
             msg = 'No text to read on clipboard. Copy some text.'
         else:
-            blocks = re.split(r'(?:\n\s*\n|(?<=[.!?]) +|\n+)', content) # incl. whitespace/linebreaks
-            self.blocks = [self.clear_block(block) for block in blocks if block.strip()]
+            self.content = content
             return True
             
         print(msg) 
-        self.view['text_block'].text = msg 
+        self.updater.set('text_block', 'text', msg)
         return False
         
-    def clear_block(self, block):
-        """Clean up clipboard strings:
-            - Remove word splits caused by line breaks
-            - Remove footnote numbers appearing at the end of sentences.
-              (Note: Line breaks in the clipboard are replaced by spaces.)
-        """ 
-        # fuse split words 
-        block = re.sub('-\s', '', block) 
-        
-        # remove footnote numbers 
-        block = re.sub(r'\.(\d+)(\s|$)', r'.\2', block) 
+    def prepare_blocks(self, table):
+        """Runs in the pipeline's worker thread, see ClipboardReader.prepare_table.
+        Preparation starts at the table's cursor, i.e. the current block.
+        Line-broken blocks are merged up to COALESCE_SECONDS of speech at RATE (see read_text).
+        """
+        return self.cr.prepare_table(table, table.cursor, self.session)
         
-        return block
-
     def stop_speaking(self, sender):
-        """Stop the speaking.
+        """Stop the speaking. Texts queued by the watcher are dropped.
         """
+        self.waiting.clear()
+        self.pipeline.cancel()
+        self.scheduler.stop()
         if self.cr.is_speaking():
             self.cr.stop_speaking()
+        self.save_session()
         
 if __name__ == '__main__':
     app = ClipboardReaderApp()
+    if WATCH_CLIPBOARD:
+        app.watch_clipboard()
     app.read_clipboard()
@@ -0,0 +1,176 @@
+import math
+import re
+from bisect import bisect_right
+from collections import Counter
+
+from language_detection import LanguageDetector
+from ngram_profiles import CYRILLIC, LATIN, SCRIPTS
+
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+NGRAM_SIZES = (1, 2, 3)
+SMOOTHING = 0.1  # pseudo count of n-grams a language has never seen
+SCRIPT_STARTS = [start for start, _, _ in SCRIPTS]
+
+# returned if a text has no letters of a known script, no voice matches it
+UNDETERMINED = 'und'
+
+
+def ngrams(text: str) -> Counter:
+    """Count the character uni-, bi- and trigrams of all words in text. Words are padded with spaces to capture prefixes and suffixes.
+    """
+    grams = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f' {word} '
+        for n in NGRAM_SIZES:
+            grams.extend([padded[i:i + n] for i in range(len(padded) - n + 1)])
+    return Counter(grams)
+
+
+def script_of(char: str) -> str:
+    """Return 'latin', 'cyrillic' or the language code of a single-language script (e.g. 'el') of a letter.
+    """
+    code = ord(char)
+    if code < SCRIPT_STARTS[0]:
+        return 'latin'
+    i = bisect_right(SCRIPT_STARTS, code) - 1
+    if code <= SCRIPTS[i][1]:
+        return SCRIPTS[i][2]
+    return 'latin'
+
+
+def dominant_script(text: str):
+    """Return the script most letters of text are written in or None if text has no letters.
+    """
+    if text.isascii():
+        return 'latin' if any(char.isalpha() for char in text) else None
+
+    scripts = Counter(script_of(char) for char in text if char.isalpha())
+    if not scripts:
+        return None
+
+    script = scripts.most_common(1)[0][0]
+    # Japanese mixes kanji with kana, Chinese has no kana
+    if script == 'zh' and scripts['ja']:
+        return 'ja'
+    return script
+
+
+class NgramModel:
+    """Naive Bayes classifier over character n-grams for languages sharing one script.
+
+    Profiles are built once from the training texts. The table only stores, per n-gram, the languages that
+    have seen it together with their bonus over the score of an unseen n-gram, so scoring a text touches
+    just a few numbers per n-gram.
+    """
+    def __init__(self, texts: dict, smoothing=SMOOTHING):
+        self.languages = sorted(texts)
+        counts = [ngrams(texts[language]) for language in self.languages]
+        vocabulary = set().union(*counts)
+
+        # log probability of an unseen n-gram per language (additive smoothing)
+        self.floors = [math.log(smoothing / (sum(c.values()) + smoothing * len(vocabulary))) for c in counts]
+
+        table = {}
+        for i, c in enumerate(counts):
+            for gram, n in c.items():
+                # log((n + smoothing) / total) - log(smoothing / total)
+                table.setdefault(gram, []).append((i, math.log((n + smoothing) / smoothing)))
+        self.table = {gram: tuple(entries) for gram, entries in table.items()}
+
+    def word_scores(self, word: str) -> tuple:
+        """Return the number of known n-grams of word and their bonus per language.
+        """
+        table = self.table
+        scores = [0.0] * len(self.languages)
+        known = 0
+        padded = f' {word} '
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                entries = table.get(padded[i:i + n])
+                if entries is None:
+                    continue
+                known += 1
+                for language, bonus in entries:
+                    scores[language] += bonus
+        return known, scores
+
+    def classify_many(self, texts) -> list:
+        """Return the most likely language of each text or None if none of its n-grams is known.
+
+        Scores are sums over words, so the n-grams of each distinct word are extracted and looked up once per
+        batch. Most words of a text occur in other texts of the batch as well and only cost a dict lookup.
+        """
+        words = {}  # word: (known n-grams, scores)
+        floors = self.floors
+        results = []
+
+        for text in texts:
+            scores = [0.0] * len(self.languages)
+            known = 0
+            for word in WORD_PATTERN.findall(text.lower()):
+                entry = words.get(word)
+                if entry is None:
+                    entry = words[word] = self.word_scores(word)
+                if entry[0]:
+                    known += entry[0]
+                    scores = [score + bonus for score, bonus in zip(scores, entry[1])]
+
+            if not known:
+                results.append(None)
+                continue
+            totals = [score + known * floor for score, floor in zip(scores, floors)]
+            results.append(self.languages[totals.index(max(totals))])
+
+        return results
+
+
+_MODELS = {}
+
+
+def load_models() -> dict:
+    """Build the n-gram models on first use and return them, keyed by script.
+    """
+    if not _MODELS:
+        _MODELS['latin'] = NgramModel(LATIN)
+        _MODELS['cyrillic'] = NgramModel(CYRILLIC)
+    return _MODELS
+
+
+class NgramDetector(LanguageDetector):
+    """Offline language detector in pure Python.
+
+    Single-language scripts (Greek, Hebrew, Thai, ...) are recognized by their code points, Latin and Cyrillic
+    texts by character n-gram profiles (up to trigrams). Only the first max_chars characters of a text are analyzed.
+    """
+    def __init__(self, max_chars=1000):
+        self.max_chars = max_chars
+        self.models = load_models()
+
+    def detect(self, text: str) -> str:
+        return self.detect_many([text])[0]
+
+    def detect_many(self, texts) -> list:
+        """Detect the languages of many texts at once. Texts are grouped by script and each group is scored in
+        one batch (see NgramModel.classify_many). Identical texts are only scored once.
+        """
+        models = self.models
+        max_chars = self.max_chars
+        detected = {}  # text: language
+        batches = {}  # script: texts to score with its model
+
+        for text in texts:
+            text = text[:max_chars]
+            if text in detected:
+                continue
+            script = dominant_script(text)
+            if script in models:
+                detected[text] = None
+                batches.setdefault(script, []).append(text)
+            else:
+                detected[text] = script or UNDETERMINED
+
+        for script, batch in batches.items():
+            for text, language in zip(batch, models[script].classify_many(batch)):
+                detected[text] = language or UNDETERMINED
+
+        return [detected[text[:max_chars]] for text in texts]
@@ -0,0 +1,49 @@
+# Training texts for the n-gram language detector (see ngram_detector.py).
+# Languages written in Latin or Cyrillic script need n-gram profiles. Languages with a script of their own
+# (Arabic, Greek, Hebrew, Hindi, Thai, Korean, Japanese and Chinese) are detected by their script alone.
+# Keys are the language codes the voice index expects, i.e. prefixes of the voice languages in preferences.py.
+
+LATIN = {
+    'ca': "Tots els éssers humans neixen lliures i iguals en dignitat i en drets. Són dotats de raó i de consciència, i han de comportar-se fraternalment els uns amb els altres. Aquest matí feia molt de fred, així que m'he quedat a casa i he llegit un llibre sobre la història de la ciutat. Quan copies un text al porta-retalls, una veu que correspon a la llengua el llegirà en veu alta. Ella va dir que tornarien més tard al vespre després de la feina. No hi ha res més agradable que un passeig tranquil pel parc en una tarda assolellada amb els amics i la família. Ahir vaig anar al mercat a comprar pa, formatge i fruita. Els nens juguen a fora mentre els seus pares fan el sopar. Saps on és la farmàcia més propera? Hem d'acabar aquesta feina abans del final de la setmana, si no, no tindrem temps per fer vacances.",
+    'cs': "Všichni lidé rodí se svobodní a sobě rovní co do důstojnosti a práv. Jsou nadáni rozumem a svědomím a mají spolu jednat v duchu bratrství. Dnes ráno byla velká zima, tak jsem zůstal doma a četl knihu o historii města. Když zkopírujete text do schránky, přečte ho nahlas hlas, který odpovídá jazyku. Řekla, že se vrátí později večer po práci. Není nic příjemnějšího než klidná procházka parkem za slunečného odpoledne s přáteli a rodinou. Včera jsem šel na trh koupit chleba, sýr a ovoce. Děti si hrají venku, zatímco jejich rodiče vaří večeři. Víš, kde je nejbližší lékárna? Musíme tuto práci dokončit před koncem týdne, jinak nebudeme mít čas na dovolenou.",
+    'da': "Alle mennesker er født frie og lige i værdighed og rettigheder. De er udstyret med fornuft og samvittighed, og de bør handle mod hverandre i en broderskabets ånd. I morges var det meget koldt, så jeg blev hjemme og læste en bog om byens historie. Når du kopierer en tekst til udklipsholderen, bliver den læst højt af en stemme, der passer til sproget. Hun sagde, at de ville komme tilbage senere på aftenen efter arbejde. Der er intet dejligere end en stille gåtur gennem parken på en solrig eftermiddag med venner og familie. I går gik jeg på markedet for at købe brød, ost og frugt. Børnene leger udenfor, mens deres forældre laver aftensmad. Ved du, hvor det nærmeste apotek er? Vi skal gøre dette arbejde færdigt inden udgangen af ugen, ellers har vi ikke tid til en ferie.",
+    'de': "Alle Menschen sind frei und gleich an Würde und Rechten geboren. Sie sind mit Vernunft und Gewissen begabt und sollen einander im Geist der Brüderlichkeit begegnen. Heute Morgen war es sehr kalt, deshalb bin ich zu Hause geblieben und habe ein Buch über die Geschichte der Stadt gelesen. Wenn du einen Text in die Zwischenablage kopierst, wird er von einer Stimme vorgelesen, die zur Sprache passt. Sie sagte, dass sie am Abend nach der Arbeit wiederkommen würden. Es gibt nichts Schöneres als einen ruhigen Spaziergang durch den Park an einem sonnigen Nachmittag mit Freunden und der Familie. Gestern bin ich auf den Markt gegangen, um Brot, Käse und Obst zu kaufen. Die Kinder spielen draußen, während ihre Eltern das Abendessen kochen. Weißt du, wo die nächste Apotheke ist? Wir müssen diese Arbeit vor dem Ende der Woche fertig machen, sonst haben wir keine Zeit für einen Urlaub.",
+    'en': "All human beings are born free and equal in dignity and rights. They are endowed with reason and conscience and should act towards one another in a spirit of brotherhood. The weather was cold this morning, so I stayed at home and read a book about the history of the city. When you copy a text to the clipboard, the reader will speak it aloud with a voice that matches the language. She said that they would come back later in the evening after work. There is nothing more pleasant than a quiet walk through the park on a sunny afternoon with friends and family. Yesterday I went to the market to buy bread, cheese and fruit. The children are playing outside while their parents cook dinner. Do you know where the nearest pharmacy is? We have to finish this work before the end of the week, otherwise we will not have time for a holiday.",
+    'es': "Todos los seres humanos nacen libres e iguales en dignidad y derechos y, dotados como están de razón y conciencia, deben comportarse fraternalmente los unos con los otros. Esta mañana hacía mucho frío, así que me quedé en casa y leí un libro sobre la historia de la ciudad. Cuando copias un texto en el portapapeles, una voz que corresponde al idioma lo leerá en voz alta. Ella dijo que volverían más tarde por la noche después del trabajo. No hay nada más agradable que un paseo tranquilo por el parque en una tarde soleada con los amigos y la familia. Ayer fui al mercado a comprar pan, queso y fruta. Los niños juegan fuera mientras sus padres preparan la cena. ¿Sabes dónde está la farmacia más cercana? Tenemos que terminar este trabajo antes del fin de semana, si no, no tendremos tiempo para unas vacaciones.",
+    'fi': "Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja oikeuksiltaan. Heille on annettu järki ja omatunto, ja heidän on toimittava toisiaan kohtaan veljeyden hengessä. Tänä aamuna oli todella kylmä, joten jäin kotiin ja luin kirjan kaupungin historiasta. Kun kopioit tekstin leikepöydälle, kieleen sopiva ääni lukee sen ääneen. Hän sanoi, että he tulisivat takaisin myöhemmin illalla töiden jälkeen. Mikään ei ole mukavampaa kuin rauhallinen kävely puistossa aurinkoisena iltapäivänä ystävien ja perheen kanssa. Eilen menin torille ostamaan leipää, juustoa ja hedelmiä. Lapset leikkivät ulkona, kun heidän vanhempansa laittavat päivällistä. Tiedätkö, missä lähin apteekki on? Meidän täytyy saada tämä työ valmiiksi ennen viikon loppua, muuten meillä ei ole aikaa lomalle.",
+    'fr': "Tous les êtres humains naissent libres et égaux en dignité et en droits. Ils sont doués de raison et de conscience et doivent agir les uns envers les autres dans un esprit de fraternité. Ce matin il faisait très froid, alors je suis resté à la maison et j'ai lu un livre sur l'histoire de la ville. Quand vous copiez un texte dans le presse-papiers, il sera lu à haute voix par une voix qui correspond à la langue. Elle a dit qu'ils reviendraient plus tard dans la soirée après le travail. Il n'y a rien de plus agréable qu'une promenade tranquille dans le parc par un après-midi ensoleillé avec des amis et la famille. Hier, je suis allé au marché pour acheter du pain, du fromage et des fruits. Les enfants jouent dehors pendant que leurs parents préparent le dîner. Savez-vous où se trouve la pharmacie la plus proche ? Nous devons terminer ce travail avant la fin de la semaine, sinon nous n'aurons pas le temps de partir en vacances.",
+    'hr': "Sva ljudska bića rađaju se slobodna i jednaka u dostojanstvu i pravima. Ona su obdarena razumom i sviješću pa jedna prema drugima trebaju postupati u duhu bratstva. Jutros je bilo jako hladno, pa sam ostao kod kuće i čitao knjigu o povijesti grada. Kada kopirate tekst u međuspremnik, naglas će ga pročitati glas koji odgovara jeziku. Rekla je da će se vratiti kasnije navečer nakon posla. Nema ništa ugodnije od mirne šetnje kroz park za sunčanog poslijepodneva s prijateljima i obitelji. Jučer sam otišao na tržnicu kupiti kruh, sir i voće. Djeca se igraju vani dok im roditelji kuhaju večeru. Znaš li gdje je najbliža ljekarna? Moramo završiti ovaj posao prije kraja tjedna, inače nećemo imati vremena za godišnji odmor.",
+    'hu': "Minden emberi lény szabadon születik és egyenlő méltósága és joga van. Az emberek, ésszel és lelkiismerettel bírván, egymással szemben testvéri szellemben kell hogy viseltessenek. Ma reggel nagyon hideg volt, ezért otthon maradtam és olvastam egy könyvet a város történetéről. Ha egy szöveget a vágólapra másolsz, egy a nyelvhez illő hang hangosan felolvassa. Azt mondta, hogy később este, munka után jönnek vissza. Nincs kellemesebb egy nyugodt sétánál a parkban egy napos délutánon a barátokkal és a családdal. Tegnap elmentem a piacra kenyeret, sajtot és gyümölcsöt venni. A gyerekek kint játszanak, amíg a szüleik vacsorát főznek. Tudod, hol van a legközelebbi gyógyszertár? Be kell fejeznünk ezt a munkát a hét vége előtt, különben nem lesz időnk szabadságra menni.",
+    'id': "Semua orang dilahirkan merdeka dan mempunyai martabat dan hak-hak yang sama. Mereka dikaruniai akal dan hati nurani dan hendaknya bergaul satu sama lain dalam semangat persaudaraan. Pagi ini cuacanya sangat dingin, jadi saya tinggal di rumah dan membaca buku tentang sejarah kota. Ketika Anda menyalin teks ke papan klip, teks itu akan dibacakan dengan suara yang sesuai dengan bahasanya. Dia bilang mereka akan kembali nanti malam setelah bekerja. Tidak ada yang lebih menyenangkan daripada berjalan-jalan santai di taman pada sore yang cerah bersama teman dan keluarga. Kemarin saya pergi ke pasar untuk membeli roti, keju, dan buah-buahan. Anak-anak bermain di luar sementara orang tua mereka memasak makan malam. Apakah kamu tahu di mana apotek terdekat? Kita harus menyelesaikan pekerjaan ini sebelum akhir minggu, kalau tidak kita tidak akan punya waktu untuk berlibur.",
+    'it': "Tutti gli esseri umani nascono liberi ed eguali in dignità e diritti. Essi sono dotati di ragione e di coscienza e devono agire gli uni verso gli altri in spirito di fratellanza. Stamattina faceva molto freddo, quindi sono rimasto a casa e ho letto un libro sulla storia della città. Quando copi un testo negli appunti, verrà letto ad alta voce da una voce che corrisponde alla lingua. Lei ha detto che sarebbero tornati più tardi in serata dopo il lavoro. Non c'è niente di più piacevole di una passeggiata tranquilla nel parco in un pomeriggio di sole con gli amici e la famiglia. Ieri sono andato al mercato a comprare pane, formaggio e frutta. I bambini giocano fuori mentre i loro genitori preparano la cena. Sai dov'è la farmacia più vicina? Dobbiamo finire questo lavoro prima della fine della settimana, altrimenti non avremo tempo per una vacanza.",
+    'ms': "Semua manusia dilahirkan bebas dan samarata dari segi kemuliaan dan hak-hak. Mereka mempunyai pemikiran dan perasaan hati dan hendaklah bertindak di antara satu sama lain dengan semangat persaudaraan. Pagi tadi cuaca sangat sejuk, jadi saya duduk di rumah dan membaca sebuah buku mengenai sejarah bandar. Apabila anda menyalin teks ke papan keratan, teks itu akan dibaca dengan kuat oleh suara yang sepadan dengan bahasanya. Dia berkata bahawa mereka akan pulang lewat malam nanti selepas kerja. Tiada yang lebih menyeronokkan daripada bersiar-siar di taman pada petang yang cerah bersama kawan-kawan dan keluarga. Semalam saya pergi ke pasar untuk membeli roti, keju dan buah-buahan. Kanak-kanak bermain di luar sementara ibu bapa mereka memasak makan malam. Adakah awak tahu di mana farmasi yang paling dekat? Kita mesti menyiapkan kerja ini sebelum hujung minggu, kalau tidak kita tidak akan sempat bercuti.",
+    'nb': "Alle mennesker er født frie og med samme menneskeverd og menneskerettigheter. De er utstyrt med fornuft og samvittighet og bør handle mot hverandre i brorskapets ånd. I morges var det veldig kaldt, så jeg ble hjemme og leste en bok om byens historie. Når du kopierer en tekst til utklippstavlen, blir den lest høyt av en stemme som passer til språket. Hun sa at de skulle komme tilbake senere på kvelden etter jobben. Det finnes ikke noe hyggeligere enn en rolig tur gjennom parken en solfylt ettermiddag sammen med venner og familie. I går dro jeg på markedet for å kjøpe brød, ost og frukt. Barna leker ute mens foreldrene deres lager middag. Vet du hvor det nærmeste apoteket ligger? Vi må bli ferdige med dette arbeidet før slutten av uka, ellers har vi ikke tid til ferie.",
+    'nl': "Alle mensen worden vrij en gelijk in waardigheid en rechten geboren. Zij zijn begiftigd met verstand en geweten, en behoren zich jegens elkander in een geest van broederschap te gedragen. Vanochtend was het erg koud, dus ik bleef thuis en las een boek over de geschiedenis van de stad. Als je een tekst naar het klembord kopieert, wordt die voorgelezen door een stem die bij de taal past. Ze zei dat ze later op de avond na het werk terug zouden komen. Er is niets aangenamer dan een rustige wandeling door het park op een zonnige middag met vrienden en familie. Gisteren ben ik naar de markt gegaan om brood, kaas en fruit te kopen. De kinderen spelen buiten terwijl hun ouders het avondeten koken. Weet jij waar de dichtstbijzijnde apotheek is? We moeten dit werk voor het einde van de week afmaken, anders hebben we geen tijd voor een vakantie.",
+    'pl': "Wszyscy ludzie rodzą się wolni i równi pod względem swej godności i swych praw. Są oni obdarzeni rozumem i sumieniem i powinni postępować wobec innych w duchu braterstwa. Dziś rano było bardzo zimno, więc zostałem w domu i przeczytałem książkę o historii miasta. Kiedy kopiujesz tekst do schowka, zostanie on przeczytany na głos przez głos pasujący do języka. Powiedziała, że wrócą później wieczorem po pracy. Nie ma nic przyjemniejszego niż spokojny spacer po parku w słoneczne popołudnie z przyjaciółmi i rodziną. Wczoraj poszedłem na targ, żeby kupić chleb, ser i owoce. Dzieci bawią się na dworze, a ich rodzice gotują kolację. Czy wiesz, gdzie jest najbliższa apteka? Musimy skończyć tę pracę przed końcem tygodnia, inaczej nie będziemy mieli czasu na urlop.",
+    'pt': "Todos os seres humanos nascem livres e iguais em dignidade e em direitos. Dotados de razão e de consciência, devem agir uns para com os outros em espírito de fraternidade. Hoje de manhã estava muito frio, por isso fiquei em casa e li um livro sobre a história da cidade. Quando você copia um texto para a área de transferência, ele será lido em voz alta por uma voz que corresponde ao idioma. Ela disse que eles voltariam mais tarde à noite depois do trabalho. Não há nada mais agradável do que um passeio tranquilo pelo parque numa tarde de sol com os amigos e a família. Ontem fui ao mercado comprar pão, queijo e fruta. As crianças brincam lá fora enquanto os pais fazem o jantar. Sabe onde fica a farmácia mais próxima? Temos de acabar este trabalho antes do fim da semana, senão não vamos ter tempo para umas férias.",
+    'ro': "Toate ființele umane se nasc libere și egale în demnitate și în drepturi. Ele sunt înzestrate cu rațiune și conștiință și trebuie să se comporte unele față de altele în spiritul fraternității. Azi dimineață a fost foarte frig, așa că am rămas acasă și am citit o carte despre istoria orașului. Când copiați un text în clipboard, acesta va fi citit cu voce tare de o voce potrivită limbii. Ea a spus că se vor întoarce mai târziu seara după muncă. Nu există nimic mai plăcut decât o plimbare liniștită prin parc într-o după-amiază însorită cu prietenii și familia. Ieri am mers la piață să cumpăr pâine, brânză și fructe. Copiii se joacă afară în timp ce părinții lor pregătesc cina. Știi unde este cea mai apropiată farmacie? Trebuie să terminăm această lucrare înainte de sfârșitul săptămânii, altfel nu vom avea timp de concediu.",
+    'sk': "Všetci ľudia sa rodia slobodní a sebe rovní, čo sa týka ich dôstojnosti a práv. Sú obdarení rozumom a svedomím a majú spolu jednať v bratskom duchu. Dnes ráno bola veľká zima, tak som zostal doma a čítal knihu o histórii mesta. Keď skopírujete text do schránky, prečíta ho nahlas hlas, ktorý zodpovedá jazyku. Povedala, že sa vrátia neskôr večer po práci. Nie je nič príjemnejšie ako pokojná prechádzka parkom v slnečné popoludnie s priateľmi a rodinou. Včera som išiel na trh kúpiť chlieb, syr a ovocie. Deti sa hrajú vonku, zatiaľ čo ich rodičia varia večeru. Vieš, kde je najbližšia lekáreň? Musíme túto prácu dokončiť pred koncom týždňa, inak nebudeme mať čas na dovolenku.",
+    'sv': "Alla människor är födda fria och lika i värde och rättigheter. De har utrustats med förnuft och samvete och bör handla gentemot varandra i en anda av broderskap. I morse var det väldigt kallt, så jag stannade hemma och läste en bok om stadens historia. När du kopierar en text till urklipp läses den upp av en röst som passar språket. Hon sa att de skulle komma tillbaka senare på kvällen efter jobbet. Det finns inget trevligare än en lugn promenad genom parken en solig eftermiddag med vänner och familj. Igår gick jag till marknaden för att köpa bröd, ost och frukt. Barnen leker ute medan deras föräldrar lagar middag. Vet du var närmaste apotek ligger? Vi måste bli klara med det här arbetet före veckans slut, annars hinner vi inte ta semester.",
+    'tr': "Bütün insanlar hür, haysiyet ve haklar bakımından eşit doğarlar. Akıl ve vicdana sahiptirler ve birbirlerine karşı kardeşlik zihniyeti ile hareket etmelidirler. Bu sabah hava çok soğuktu, bu yüzden evde kaldım ve şehrin tarihi hakkında bir kitap okudum. Bir metni panoya kopyaladığınızda, dile uygun bir ses onu yüksek sesle okuyacak. Akşam işten sonra daha geç geri geleceklerini söyledi. Güneşli bir öğleden sonra arkadaşlar ve aileyle parkta sakin bir yürüyüşten daha güzel bir şey yoktur. Dün ekmek, peynir ve meyve almak için pazara gittim. Çocuklar dışarıda oynarken anne babaları akşam yemeği pişiriyor. En yakın eczanenin nerede olduğunu biliyor musun? Bu işi hafta sonundan önce bitirmemiz gerekiyor, yoksa tatile vaktimiz olmayacak.",
+    'vi': "Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân phẩm và quyền lợi. Mọi con người đều được tạo hóa ban cho lý trí và lương tâm và cần phải đối xử với nhau trong tình anh em. Sáng nay trời rất lạnh nên tôi ở nhà và đọc một cuốn sách về lịch sử của thành phố. Khi bạn sao chép một đoạn văn bản vào bộ nhớ tạm, một giọng nói phù hợp với ngôn ngữ sẽ đọc to nó. Cô ấy nói rằng họ sẽ quay lại muộn hơn vào buổi tối sau giờ làm việc. Không có gì dễ chịu hơn một buổi đi dạo yên tĩnh trong công viên vào một buổi chiều nắng đẹp cùng bạn bè và gia đình. Hôm qua tôi đi chợ để mua bánh mì, phô mai và trái cây. Bọn trẻ chơi ở bên ngoài trong khi bố mẹ chúng nấu bữa tối. Bạn có biết hiệu thuốc gần nhất ở đâu không? Chúng ta phải hoàn thành công việc này trước cuối tuần, nếu không chúng ta sẽ không có thời gian đi nghỉ.",
+}
+
+CYRILLIC = {
+    'bg': "Всички хора се раждат свободни и равни по достойнство и права. Те са надарени с разум и съвест и следва да се отнасят помежду си в дух на братство. Тази сутрин беше много студено, затова си останах вкъщи и четох книга за историята на града. Когато копирате текст в клипборда, той ще бъде прочетен на глас от глас, който отговаря на езика. Тя каза, че ще се върнат по-късно вечерта след работа. Няма нищо по-приятно от спокойна разходка в парка в слънчев следобед с приятели и семейството. Вчера отидох на пазара, за да купя хляб, сирене и плодове. Децата играят навън, докато родителите им приготвят вечерята. Знаеш ли къде е най-близката аптека? Трябва да свършим тази работа преди края на седмицата, иначе няма да имаме време за почивка.",
+    'ru': "Все люди рождаются свободными и равными в своем достоинстве и правах. Они наделены разумом и совестью и должны поступать в отношении друг друга в духе братства. Сегодня утром было очень холодно, поэтому я остался дома и читал книгу об истории города. Когда вы копируете текст в буфер обмена, его прочитает вслух голос, который подходит к языку. Она сказала, что они вернутся позже вечером после работы. Нет ничего приятнее, чем спокойная прогулка по парку солнечным днём с друзьями и семьёй. Вчера я ходил на рынок, чтобы купить хлеб, сыр и фрукты. Дети играют на улице, пока их родители готовят ужин. Ты знаешь, где находится ближайшая аптека? Мы должны закончить эту работу до конца недели, иначе у нас не будет времени на отпуск.",
+    'uk': "Всі люди народжуються вільними і рівними у своїй гідності та правах. Вони наділені розумом і совістю і повинні діяти у відношенні один до одного в дусі братерства. Сьогодні вранці було дуже холодно, тому я залишився вдома і читав книжку про історію міста. Коли ви копіюєте текст у буфер обміну, його прочитає вголос голос, який відповідає мові. Вона сказала, що вони повернуться пізніше ввечері після роботи. Немає нічого приємнішого, ніж спокійна прогулянка парком сонячного дня з друзями та родиною. Учора я ходив на ринок, щоб купити хліб, сир і фрукти. Діти граються надворі, поки їхні батьки готують вечерю. Ти знаєш, де знаходиться найближча аптека? Ми повинні закінчити цю роботу до кінця тижня, інакше в нас не буде часу на відпустку.",
+}
+
+# (first code point, last code point, language) of scripts used by a single language of the voice catalog
+SCRIPTS = [
+    (0x0370, 0x03FF, 'el'),
+    (0x0400, 0x04FF, 'cyrillic'),
+    (0x0590, 0x05FF, 'he'),
+    (0x0600, 0x06FF, 'ar'),
+    (0x0900, 0x097F, 'hi'),
+    (0x0E00, 0x0E7F, 'th'),
+    (0x1100, 0x11FF, 'ko'),
+    (0x3040, 0x30FF, 'ja'),
+    (0x4E00, 0x9FFF, 'zh'),
+    (0xAC00, 0xD7AF, 'ko'),
+]
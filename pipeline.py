@@ -0,0 +1,166 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# A block ready to be spoken. voice is a catalog entry (see voices.py) or None to keep the current voice,
+# rate is None to use the reader's current rate, index is the block's position in its BlockTable.
+PreparedBlock = namedtuple('PreparedBlock', 'text language voice rate index', defaults=(None,))
+
+# put into the queue after the last block
+END = None
+# returned by next_block() instead of waiting for the worker, see Pipeline
+NOT_READY = object()
+
+
+class Pipeline:
+    """Prepares blocks in a worker thread ahead of playback.
+
+    The worker runs prepare(source), a generator of PreparedBlocks, and puts its blocks into a bounded queue.
+    Playback only takes finished blocks from the queue with next_block(). A new start() or cancel() stops
+    the worker after its current block; blocks of a cancelled run are never returned. A new worker waits for
+    the previous one before it starts, so only one worker at a time prepares blocks.
+
+    With on_ready next_block() never waits: if the worker hasn't prepared the next block yet it returns
+    NOT_READY, and the worker calls on_ready() from its thread once the block is queued, e.g. to ask for it
+    again on the main thread. Without on_ready next_block() waits for the worker, e.g. in headless runs.
+    """
+    def __init__(self, prepare, maxsize=8, clock=time.perf_counter, on_ready=None):
+        self.prepare = prepare
+        self.maxsize = maxsize
+        self.clock = clock
+        self.on_ready = on_ready
+
+        self.queue = queue.Queue(maxsize)
+        self.cancelled = threading.Event()
+        self.worker = None
+        self.finished = True
+        self.lock = threading.Lock()
+        self.waiting = False  # playback got NOT_READY and waits for on_ready
+        self.stalled_at = None
+
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.depths = []  # queue depth whenever playback asked for a block
+        self.stalls = 0  # number of times playback had to wait for the worker
+        self.stall_time = 0.0
+        self.stalled_at = None
+
+    def start(self, source):
+        """Cancel the current run and start preparing source, e.g. a text or a BlockTable.
+        """
+        self.cancel()
+        self.reset_metrics()
+
+        # every run gets its own queue and event so a worker that's still finishing can't interfere
+        self.queue = queue.Queue(self.maxsize)
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.waiting = False
+        previous = self.worker
+        self.worker = threading.Thread(target=self.produce, args=(source, self.queue, self.cancelled, previous), daemon=True)
+        self.worker.start()
+
+    def produce(self, source, blocks, cancelled, previous=None):
+        """Worker thread: put prepared blocks into the queue until source is done or the run is cancelled.
+        """
+        # the cancelled worker leaves after its current block: two workers would share detector and language runs
+        if previous is not None:
+            previous.join()
+
+        try:
+            for block in self.prepare(source):
+                if not self.put(blocks, block, cancelled):
+                    return
+        except Exception as e:
+            print(f"Error preparing blocks: {e}")
+        self.put(blocks, END, cancelled)
+
+    def put(self, blocks, block, cancelled) -> bool:
+        """Put block into the queue, waiting while it is full, and tell waiting playback. Returns False if the run was cancelled.
+        """
+        while not cancelled.is_set():
+            try:
+                blocks.put(block, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        else:
+            return False
+
+        with self.lock:
+            ready = self.waiting and not cancelled.is_set()
+            if ready:
+                self.waiting = False
+        if ready:
+            self.on_ready()
+        return True
+
+    def next_block(self):
+        """Return the next prepared block or None if the run is finished or cancelled.
+        If the worker hasn't prepared the next block yet, returns NOT_READY with on_ready, otherwise waits for it.
+        """
+        if self.finished:
+            return None
+
+        blocks, cancelled = self.queue, self.cancelled
+        if self.stalled_at is None:
+            self.depths.append(blocks.qsize())
+
+        if self.on_ready is not None:
+            with self.lock:
+                try:
+                    block = blocks.get_nowait()
+                except queue.Empty:
+                    # the worker calls on_ready after its next put
+                    self.waiting = True
+                    if self.stalled_at is None:
+                        self.stalls += 1
+                        self.stalled_at = self.clock()
+                    return NOT_READY
+            if self.stalled_at is not None:
+                self.stall_time += self.clock() - self.stalled_at
+                self.stalled_at = None
+        else:
+            try:
+                block = blocks.get_nowait()
+            except queue.Empty:
+                self.stalls += 1
+                start = self.clock()
+                block = END
+                while not cancelled.is_set():
+                    try:
+                        block = blocks.get(timeout=0.1)
+                        break
+                    except queue.Empty:
+                        continue
+                self.stall_time += self.clock() - start
+
+        if block is END or cancelled.is_set():
+            self.finished = True
+            return None
+        return block
+
+    def cancel(self):
+        """Stop the worker and drop all prepared blocks.
+        """
+        self.cancelled.set()
+        self.finished = True
+        self.waiting = False
+        self.stalled_at = None
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def metrics(self) -> dict:
+        """Return mean and min queue depth at dequeue time, number of stalls and total stall time in seconds.
+        """
+        return {
+            'mean_depth': sum(self.depths) / len(self.depths) if self.depths else 0.0,
+            'min_depth': min(self.depths, default=0),
+            'stalls': self.stalls,
+            'stall_time': self.stall_time,
+        }
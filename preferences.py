@@ -1,4 +1,21 @@
 RATE = .55 # voice speed
+LOOKAHEAD = 1 # number of blocks queued with the synthesizer ahead of time
+PIPELINE_DEPTH = 8 # number of blocks prepared ahead of playback
+RATE_TAP_DELAY = .3 # seconds to wait for further taps on faster/slower before the current block continues at the new rate
+COALESCE_SECONDS = 15 # merge lines of a paragraph and language into blocks of up to this many seconds of speech, 0 to keep every line
+DETECTION_ENGINE = 'tagger' # 'tagger' (NSLinguisticTagger) or 'ngram' (offline, pure Python)
+DETECTION_MODE = 'block' # 'block' detects every block, 'document' detects once per paragraph and changes voices only between paragraphs
+DETECTION_CACHE_SIZE = 512 # number of detected languages remembered per text block
+DETECTION_BATCH = 8 # number of blocks whose languages are detected at once
+UI_FRAMES_PER_SECOND = 15 # maximum number of display updates per second
+WATCH_INTERVAL = .5 # seconds between checks for newly copied text in watch mode
+WATCH_DEBOUNCE = 1 # seconds without another copy before newly copied text is read
+WATCH_CLIPBOARD = False # start in watch mode, the eye button switches it on and off
+SESSION_STORE_MB = 20 # disk space for reading sessions (resume where you stopped), least recently read ones are deleted first
+RENDER_WORKERS = 4 # blocks rendered at once by render.py
+RENDER_PAUSE = .3 # seconds of silence after every block in rendered audio
+PROFILING = False # record how long every stage of every block takes, see profiling.py
+PROFILE_SAMPLES = 4096 # number of timing samples kept while profiling
 VOICE_PREFERENCES = ['Martha', 'Arthur', 'Martin']
 
 # Available Voices, Okt 2024
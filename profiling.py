@@ -0,0 +1,81 @@
+import json
+import math
+import os
+import time
+from collections import deque
+
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile.json')
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile (0 to 100) of sorted values.
+    """
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+class Timings:
+    """Latency samples of the reading stages, e.g. 'detect' or 'speak', in a fixed-size ring buffer.
+
+    Usage: started = timings.start(), then timings.stop('stage', started, block_index). Disabled timings
+    don't read the clock or store anything, so the hooks can stay in place.
+    """
+    def __init__(self, size=2048, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.samples = deque(maxlen=size)  # (block index or None, stage, seconds)
+
+    def start(self) -> float:
+        return self.clock() if self.enabled else 0.0
+
+    def stop(self, stage: str, started: float, block=None):
+        if self.enabled:
+            self.samples.append((block, stage, self.clock() - started))
+
+    def record(self, stage: str, seconds: float, block=None):
+        """Add a duration measured elsewhere, e.g. between two delegate callbacks.
+        """
+        if self.enabled:
+            self.samples.append((block, stage, seconds))
+
+    def clear(self):
+        self.samples.clear()
+
+    def summary(self) -> dict:
+        """Return count, p50, p95 and max in seconds per stage.
+        """
+        stages = {}
+        for _, stage, seconds in list(self.samples):
+            stages.setdefault(stage, []).append(seconds)
+
+        result = {}
+        for stage, values in stages.items():
+            values.sort()
+            result[stage] = {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': values[-1],
+            }
+        return result
+
+    def trace(self) -> list:
+        """Return one dict per block with the seconds of each stage, in the order blocks were first seen.
+        Samples without a block (e.g. reading the clipboard) are left out.
+        """
+        blocks = {}
+        for block, stage, seconds in list(self.samples):
+            if block is not None:
+                entry = blocks.setdefault(block, {'block': block})
+                entry[stage] = entry.get(stage, 0.0) + seconds
+        return list(blocks.values())
+
+    def export(self, path=PROFILE_FILE):
+        """Write summary and per-block trace as JSON.
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({'summary': self.summary(), 'blocks': self.trace()}, file, indent=1)
+        except OSError as e:
+            print(f"Error saving profile: {e}")
@@ -0,0 +1,48 @@
+from clipboard_watcher import start_timer
+from preferences import RATE_TAP_DELAY
+
+
+class RateChanger:
+    """Applies a new rate to the block being spoken instead of the next one.
+
+    The synthesizer can't change the rate of a running utterance, so it is stopped and the rest of the block,
+    starting with the word being spoken, is spoken again at the new rate. Taps within delay seconds are
+    coalesced into one restart, so tapping faster several times doesn't stop the synthesizer every time.
+    """
+    def __init__(self, reader, scheduler, delay=RATE_TAP_DELAY, schedule=start_timer):
+        """
+        reader: ClipboardReader
+        scheduler: UtteranceScheduler speaking the reader's blocks
+        schedule: callable(delay, callback) running callback after delay seconds, by default a thread timer
+        """
+        self.reader = reader
+        self.scheduler = scheduler
+        self.delay = delay
+        self.schedule = schedule
+
+        self.pending = False
+        self.restarts = 0
+
+    def change(self, rate: float):
+        """Set the reader's rate, a value from 0 to 1, and apply it to the current block after delay seconds.
+        """
+        self.reader.rate = max(0, min(rate, 1))
+        if self.pending:
+            return
+        self.pending = True
+        self.schedule(self.delay, self.apply)
+
+    def apply(self):
+        self.pending = False
+        reader, scheduler = self.reader, self.scheduler
+
+        block = scheduler.current
+        remainder = reader.remainder(block) if block is not None and scheduler.running else None
+        if remainder is None:
+            # nothing being spoken (or just its last word): the rate applies to the next utterance
+            reader.update_speed_rate()
+            return
+
+        self.restarts += 1
+        reader.stop_speaking()
+        scheduler.restart(remainder)
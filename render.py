@@ -0,0 +1,150 @@
+"""Render a whole text into a WAV file to listen to later, with a JSON manifest of its blocks and chapters.
+
+Run with: python render.py [input.txt] output.wav [--workers N] [--synthetic]
+Without input the clipboard is rendered (Pythonista only). --synthetic uses SyntheticAudioBackend and the
+offline language detector, so rendering works on any machine.
+"""
+import argparse
+import json
+import os
+import time
+import wave
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from preferences import COALESCE_SECONDS, DETECTION_MODE, RENDER_PAUSE, RENDER_WORKERS
+from segmenter import PARAGRAPH
+from speech_backend import chars_per_second
+
+
+def resample(frames: bytes, from_rate: int, to_rate: int) -> bytes:
+    """Nearest-neighbour resampling of 16-bit mono frames. Only needed if voices render at different sample rates.
+    """
+    samples = array('h', frames)
+    count = int(len(samples) * to_rate / from_rate)
+    step = from_rate / to_rate
+    return array('h', [samples[int(i * step)] for i in range(count)]).tobytes()
+
+
+def render_document(reader, audio, content: str, output: str, workers=RENDER_WORKERS, target_chars=None) -> dict:
+    """Render content into the WAV file output and return its manifest.
+
+    Blocks are split, cleaned up, detected and given a voice by reader (a ClipboardReader) exactly like for
+    reading aloud, then rendered by audio (an AudioBackend) in a pool of workers. Finished blocks are written
+    in order while later ones are still rendering, so only a few blocks per worker are kept in memory.
+    """
+    if target_chars is None:
+        target_chars = int(COALESCE_SECONDS * chars_per_second(reader.rate))
+    table = reader.block_table(content, by_paragraph=DETECTION_MODE == 'document', target_chars=target_chars)
+    rate = reader.rate
+
+    def render_block(block):
+        return audio.render(block.text, block.voice['identifier'] if block.voice else None, rate)
+
+    manifest = {'output': os.path.basename(output), 'sample_rate': None, 'duration': 0.0,
+                'characters': len(content), 'blocks': [], 'chapters': []}
+    written = [0]  # frames
+
+    def write(out, block, chunk):
+        sample_rate = manifest['sample_rate']
+        if sample_rate is None:
+            sample_rate = manifest['sample_rate'] = chunk.sample_rate
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+
+        frames = chunk.frames
+        if chunk.sample_rate != sample_rate:
+            frames = resample(frames, chunk.sample_rate, sample_rate)
+
+        start, end, _ = table[block.index]
+        time_offset = written[0] / sample_rate
+        entry = {
+            'block': block.index, 'start': start, 'end': end, 'time': round(time_offset, 3),
+            'duration': round(len(frames) / 2 / sample_rate, 3),
+            'language': block.language, 'voice': block.voice['name'] if block.voice else None,
+        }
+        manifest['blocks'].append(entry)
+
+        # a chapter starts with every paragraph
+        if block.index == 0 or table[block.index - 1][2] == PARAGRAPH:
+            manifest['chapters'].append({'block': block.index, 'start': start, 'time': entry['time'], 'title': ' '.join(block.text[:60].split())})
+
+        pause = b'\0\0' * int(RENDER_PAUSE * sample_rate)
+        out.writeframes(frames + pause)
+        written[0] += (len(frames) + len(pause)) // 2
+
+    with ThreadPoolExecutor(max(1, workers)) as pool, wave.open(output, 'wb') as out:
+        rendering = deque()
+        for block in reader.prepare_table(table):
+            rendering.append((block, pool.submit(render_block, block)))
+            if len(rendering) >= 2 * workers:
+                block, future = rendering.popleft()
+                write(out, block, future.result())
+        while rendering:
+            block, future = rendering.popleft()
+            write(out, block, future.result())
+
+        if manifest['sample_rate'] is None:
+            # nothing to render, write an empty but valid file
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(22050)
+
+    manifest['duration'] = round(written[0] / (manifest['sample_rate'] or 22050), 3)
+    try:
+        with open(os.path.splitext(output)[0] + '.json', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+    except OSError as e:
+        print(f"Error saving manifest: {e}")
+    return manifest
+
+
+def synthetic_setup():
+    """Return reader and audio backend that work without Pythonista.
+    """
+    from audio_backend import SyntheticAudioBackend
+    from clipboard_reader import ClipboardReader
+    from language_detection import CachedDetector
+    from ngram_detector import NgramDetector
+    from speech_backend import FakeSpeechBackend
+    from voices import VoiceIndex, reference_catalog
+
+    catalog = reference_catalog()
+    reader = ClipboardReader(FakeSpeechBackend(catalog), CachedDetector(NgramDetector()), VoiceIndex(catalog))
+    return reader, SyntheticAudioBackend()
+
+
+def device_setup():
+    """Return reader and audio backend using iOS' speech synthesizer.
+    """
+    from audio_backend import ObjCAudioBackend
+    from clipboard_reader import ClipboardReader
+
+    return ClipboardReader(), ObjCAudioBackend()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', metavar='path', help='[input.txt] output.wav')
+    parser.add_argument('--workers', type=int, default=RENDER_WORKERS, help='number of blocks rendered at once')
+    parser.add_argument('--synthetic', action='store_true', help='render synthetic audio, works without Pythonista')
+    args = parser.parse_args()
+    if len(args.paths) > 2:
+        parser.error('expected [input.txt] output.wav')
+
+    paths = args.paths or ['clipboard.wav']
+    if len(paths) == 2:
+        with open(paths[0], encoding='utf-8') as file:
+            content = file.read()
+    else:
+        import clipboard
+        content = clipboard.get() or ''
+
+    reader, audio = synthetic_setup() if args.synthetic else device_setup()
+    start = time.perf_counter()
+    manifest = render_document(reader, audio, content, paths[-1], args.workers)
+    seconds = time.perf_counter() - start
+    print(f"{paths[-1]}: {len(manifest['blocks'])} blocks, {len(manifest['chapters'])} chapters,"
+          f" {manifest['duration'] / 60:.1f} min of audio in {seconds:.1f} s ({len(content) / seconds:.0f} characters/s)")
@@ -0,0 +1,154 @@
+import time
+from collections import deque
+
+from pipeline import NOT_READY
+
+
+class UtteranceScheduler:
+    """Feeds blocks to the speech synthesizer as soon as the previous utterance is finished.
+
+    The scheduler is driven by the synthesizer's delegate callbacks instead of polling:
+    on_started() and on_finished() have to be called by the didStart/didFinish delegate methods.
+    With lookahead > 1 several utterances are queued with the synthesizer ahead of time so it can
+    go from one block to the next without waiting for Python at all.
+    """
+    def __init__(self, next_block, speak, on_block=None, on_done=None, lookahead=1, clock=time.perf_counter, timings=None):
+        """
+        next_block: callable returning the next block, None when there is nothing left to read or NOT_READY
+            if the block isn't prepared yet, fill() has to be called again once it is (see pipeline.Pipeline)
+        speak: callable that starts (or queues) speaking a block, its return value is passed to on_block
+        on_block: callable(block, info) called when the synthesizer actually starts a block
+        on_done: callable called after the last block is finished
+        lookahead: number of utterances handed to the synthesizer at once
+        timings: optional profiling.Timings, records 'wait' for next_block and 'speaking' from start to finish of a block
+        """
+        self.next_block = next_block
+        self.speak = speak
+        self.on_block = on_block
+        self.on_done = on_done
+        self.lookahead = max(1, lookahead)
+        self.clock = clock
+        self.timings = timings
+
+        self.queued = deque()  # blocks handed to the synthesizer that haven't started yet
+        self.pending = 0  # blocks handed to the synthesizer that haven't finished yet
+        self.running = False
+        self.exhausted = False
+        self.last_finish = None
+        self.current = None  # block being spoken
+        self.speaking = deque()  # (block, start time) of started blocks that haven't finished yet
+        self.waiting_since = None  # time next_block was first asked for the block it hasn't prepared yet
+        self.reset_gaps()
+
+    def start(self):
+        """Start reading blocks from next_block.
+        """
+        self.stop()
+        self.reset_gaps()
+        self.running = True
+        self.exhausted = False
+        self.fill()
+
+    def stop(self):
+        """Forget queued blocks and ignore callbacks of utterances that are still spoken.
+        Stopping the synthesizer itself is up to the caller.
+        """
+        self.running = False
+        self.queued.clear()
+        self.pending = 0
+        self.last_finish = None
+        self.current = None
+        self.speaking.clear()
+        self.waiting_since = None
+
+    def reset_gaps(self):
+        """Forget the gaps of the previous run. Only count, sum and maximum are kept, however long reading goes on.
+        """
+        self.gap_count = 0
+        self.gap_total = 0.0
+        self.gap_max = 0.0
+
+    def restart(self, block):
+        """Speak block right away instead of the current block, followed by the blocks that were queued already.
+        The synthesizer has to be stopped by the caller before, e.g. to continue the current block at another rate.
+        """
+        if not self.running:
+            return
+        blocks = [block] + [queued for queued, _ in self.queued]
+        self.queued.clear()
+        self.pending = 0
+        self.current = None
+        self.speaking.clear()
+        for block in blocks:
+            self.pending += 1
+            self.queued.append((block, self.speak(block)))
+
+    def fill(self):
+        """Hand blocks to the synthesizer until lookahead utterances are pending.
+        """
+        timings = self.timings
+        while self.running and not self.exhausted and self.pending < self.lookahead:
+            if self.waiting_since is None:
+                self.waiting_since = timings.start() if timings else 0.0
+            block = self.next_block()
+            if block is NOT_READY:
+                # called again when the block is ready
+                break
+            if timings:
+                timings.stop('wait', self.waiting_since, getattr(block, 'index', None))
+            self.waiting_since = None
+            if block is None:
+                self.exhausted = True
+                break
+
+            self.pending += 1
+            self.queued.append((block, self.speak(block)))
+
+        # nothing left to read and nothing spoken anymore, e.g. a text without any blocks
+        if self.running and self.exhausted and not self.pending:
+            self.running = False
+            if self.on_done:
+                self.on_done()
+
+    def on_started(self):
+        """Delegate callback: the synthesizer started the oldest queued utterance.
+        """
+        if not self.running or not self.queued:
+            return
+
+        if self.last_finish is not None:
+            gap = self.clock() - self.last_finish
+            self.gap_count += 1
+            self.gap_total += gap
+            self.gap_max = max(self.gap_max, gap)
+            self.last_finish = None
+
+        block, info = self.queued.popleft()
+        self.current = block
+        if self.timings and self.timings.enabled:
+            self.speaking.append((block, self.clock()))
+        if self.on_block:
+            self.on_block(block, info)
+
+    def on_finished(self):
+        """Delegate callback: the synthesizer finished an utterance.
+        """
+        if not self.running:
+            return
+
+        self.last_finish = self.clock()
+        self.pending = max(0, self.pending - 1)
+        self.current = None
+        if self.speaking:
+            block, started = self.speaking.popleft()
+            self.timings.record('speaking', self.last_finish - started, getattr(block, 'index', None))
+        self.fill()
+
+    def gap_summary(self) -> dict:
+        """Return count, mean and max of the silent gaps between blocks in seconds since start().
+        """
+        return {
+            'count': self.gap_count,
+            'mean': self.gap_total / self.gap_count if self.gap_count else 0.0,
+            'max': self.gap_max,
+        }
@@ -0,0 +1,224 @@
+import re
+import threading
+from array import array
+
+# Blocks end at blank lines, after sentence punctuation or at line breaks (incl. whitespace/linebreaks)
+SPLIT_PATTERN = re.compile(r'(?:\n\s*\n|(?<=[.!?]) +|\n+)')
+# strength of the boundary after a block
+SENTENCE, LINE, PARAGRAPH = 1, 2, 3
+
+SPLIT_WORD_PATTERN = re.compile(r'-\s')
+FOOTNOTE_PATTERN = re.compile(r'\.(\d+)(\s|$)')
+# blocks a BlockTable splits ahead of the one asked for
+FILL_AHEAD = 64
+
+
+def clear_block(block: str) -> str:
+    """Clean up clipboard strings:
+        - Remove word splits caused by line breaks
+        - Remove footnote numbers appearing at the end of sentences.
+          (Note: Line breaks in the clipboard are replaced by spaces.)
+    """
+    # fuse split words
+    block = SPLIT_WORD_PATTERN.sub('', block)
+
+    # remove footnote numbers
+    block = FOOTNOTE_PATTERN.sub(r'.\2', block)
+
+    return block
+
+
+def iter_block_spans(content: str):
+    """Lazily yield (start, end) offsets of all non-blank blocks in content.
+    Same splitting rules as re.split(SPLIT_PATTERN, content) but no block is copied before it is needed.
+    """
+    return iter_spans(content, SPLIT_PATTERN)
+
+
+def iter_spans(content: str, pattern):
+    """Lazily yield (start, end) offsets of all non-blank pieces of content between matches of pattern.
+    """
+    start = 0
+    for separator in pattern.finditer(content):
+        end = separator.start()
+        if start < end and not content[start:end].isspace():
+            yield start, end
+        start = separator.end()
+
+    if start < len(content) and not content[start:].isspace():
+        yield start, len(content)
+
+
+def iter_blocks(content: str):
+    """Lazily yield cleaned blocks of content, one sentence or line at a time.
+    Speech can start with the first block while the rest of the text is still unsplit.
+    """
+    for start, end in iter_block_spans(content):
+        yield clear_block(content[start:end])
+
+
+def iter_flagged_spans(content: str):
+    """Like iter_block_spans but yield (start, end, boundary) where boundary is SENTENCE, LINE or PARAGRAPH,
+    the strongest separator between the block and the next one. The last block ends with PARAGRAPH.
+    """
+    previous = None
+    boundary = PARAGRAPH
+    start = 0
+    for separator in SPLIT_PATTERN.finditer(content):
+        end = separator.start()
+        if start < end and not content[start:end].isspace():
+            if previous:
+                yield previous[0], previous[1], boundary
+            previous = start, end
+            boundary = SENTENCE
+
+        newlines = separator.group().count('\n')
+        boundary = max(boundary, PARAGRAPH if newlines > 1 else LINE if newlines else SENTENCE)
+        start = separator.end()
+
+    if start < len(content) and not content[start:].isspace():
+        if previous:
+            yield previous[0], previous[1], boundary
+        previous = start, len(content)
+
+    if previous:
+        yield previous[0], previous[1], PARAGRAPH
+
+
+def coalesce_spans(spans, target_chars: int, min_chars=40, language_of=None):
+    """Merge adjacent (start, end, boundary) spans into blocks of up to target_chars characters.
+
+    Blocks are merged across line breaks, but across sentence ends only while the block is shorter than min_chars,
+    and never across paragraphs. With language_of (a callable returning the language of the span start:end, or None
+    if it can't tell) blocks of different languages are never merged. Languages are only asked for spans that
+    could be merged otherwise.
+    """
+    current = None
+    language = None  # language of the current block, once asked for
+    asked = False
+    for start, end, boundary in spans:
+        if current:
+            first, last, previous_boundary = current
+            mergeable = (
+                previous_boundary == LINE
+                or (previous_boundary == SENTENCE and last - first < min_chars)
+            )
+            if mergeable and end - first <= target_chars:
+                if language_of is None:
+                    current = first, end, boundary
+                    continue
+                if not asked:
+                    language, asked = language_of(first, last), True
+                following = language_of(start, end)
+                if language is None or following is None or language == following:
+                    current = first, end, boundary
+                    language = language or following
+                    continue
+                # the span starts the next block, its language is known already
+                yield current
+                current = start, end, boundary
+                language = following
+                continue
+            yield current
+        current = start, end, boundary
+        language, asked = None, False
+
+    if current:
+        yield current
+
+
+class BlockTable:
+    """Blocks of a text as offsets into it instead of copied strings.
+
+    starts, ends and boundaries are compact arrays filled lazily from a span iterator (e.g. iter_flagged_spans),
+    so reading can start before the whole text is split. Blocks are only copied and cleaned when text() is
+    called. cursor marks the current block; moving it doesn't remove anything, so seeking back is cheap.
+    """
+    def __init__(self, content: str, spans, runs=None):
+        """
+        spans: iterable of (start, end, boundary)
+        runs: optional LanguageRuns (or LineLanguages) of content, see language()
+        """
+        self.content = content
+        self.runs = runs
+        self.starts = array('q')
+        self.ends = array('q')
+        self.boundaries = array('b')
+        self.cursor = 0
+
+        self.spans = iter(spans)
+        self.complete = False
+        self.lock = threading.Lock()
+
+    def fill(self, index: int) -> bool:
+        """Split the text up to block index. Returns False if there is no such block.
+        """
+        if index < len(self.starts):
+            return True
+
+        with self.lock:
+            # split a few blocks ahead so sequential reading doesn't take the lock for every block
+            target = index + FILL_AHEAD
+            starts, ends, boundaries = self.starts, self.ends, self.boundaries
+            while len(starts) <= target and not self.complete:
+                span = next(self.spans, None)
+                if span is None:
+                    self.complete = True
+                    break
+                starts.append(span[0])
+                ends.append(span[1])
+                boundaries.append(span[2])
+        return index < len(self.starts)
+
+    def __len__(self):
+        """Number of blocks. Splits the whole text.
+        """
+        while self.fill(len(self.starts)):
+            pass
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> tuple:
+        """Return (start, end, boundary) of block index.
+        """
+        if index < 0 or not self.fill(index):
+            raise IndexError(index)
+        return self.starts[index], self.ends[index], self.boundaries[index]
+
+    def text(self, index: int) -> str:
+        """Return the cleaned text of block index.
+        """
+        if index < 0 or not self.fill(index):
+            raise IndexError(index)
+        return clear_block(self.content[self.starts[index]:self.ends[index]])
+
+    def language(self, index: int):
+        """Return the language of block index according to the language runs or None without runs.
+        """
+        return self.runs.language_at(self.starts[index]) if self.runs and self.fill(index) else None
+
+    def indices(self, first=0):
+        """Lazily yield all block indices from first on.
+        """
+        index = max(0, first)
+        while self.fill(index):
+            yield index
+            index += 1
+
+    def seek(self, delta: int) -> int:
+        """Move the cursor by delta blocks, but not before the first or after the last block. Returns the new cursor.
+        """
+        cursor = max(0, self.cursor + delta)
+        if not self.fill(cursor):
+            # the text is split completely now
+            cursor = max(0, len(self.starts) - 1)
+        self.cursor = cursor
+        return cursor
+
+    @classmethod
+    def from_arrays(cls, content: str, starts, ends, boundaries, runs=None):
+        """Return a table of content with blocks that are already known, e.g. from a reading session.
+        """
+        table = cls(content, (), runs)
+        table.starts, table.ends, table.boundaries = starts, ends, boundaries
+        table.complete = True
+        return table
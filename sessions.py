@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import threading
+from array import array
+
+from preferences import SESSION_STORE_MB
+from segmenter import BlockTable
+
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions')
+VERSION = 2
+
+# the progress log is rewritten with just the latest position once it grows beyond this
+PROGRESS_LOG_BYTES = 4096
+
+
+def content_key(content: str) -> str:
+    """Return the hash a text's session is stored under.
+    """
+    return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class ReadingSession:
+    """Everything known about reading one text: its blocks, the language and voice of every prepared block
+    and the index of the block spoken last.
+
+    settings are the options the blocks were split with (see ClipboardReader.block_table), a session is
+    only reused with the same settings.
+    """
+    def __init__(self, key: str, table: BlockTable, settings: dict, languages=None, voices=None, position=0):
+        self.key = key
+        self.table = table
+        self.settings = settings
+        self.languages = languages or []  # per block, None if not prepared yet
+        self.voices = voices or []  # per block, a catalog entry or None
+        self.position = position
+        self.changed = False
+
+    def block(self, index: int):
+        """Return (language, voice) of a prepared block or None if it wasn't prepared yet.
+        """
+        if index < len(self.languages) and self.languages[index] is not None:
+            return self.languages[index], self.voices[index]
+        return None
+
+    def record(self, index: int, language: str, voice):
+        """Remember language and voice of a prepared block. Called from the pipeline's worker thread.
+        """
+        missing = index + 1 - len(self.languages)
+        if missing > 0:
+            self.languages.extend([None] * missing)
+            self.voices.extend([None] * missing)
+        self.languages[index] = language
+        self.voices[index] = voice
+        self.changed = True
+
+
+class SessionStore:
+    """Reading sessions on disk, keyed by the hash of the text.
+
+    Every session has two files: <key>.blocks holds a JSON header line followed by the block offsets and
+    per block language and voice numbers as binary arrays, so opening a long document is a few reads.
+    Only the blocks split so far are stored, the text isn't split completely just to save a session.
+    <key>.progress is an append-only log of spoken block indices, so saving the position while reading
+    only appends 8 bytes. The least recently read sessions are deleted once all files exceed max_bytes.
+    """
+    def __init__(self, path=SESSIONS_DIR, max_bytes=SESSION_STORE_MB * 1_000_000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()  # sessions may be saved from a background thread
+
+    def files(self, key: str) -> tuple:
+        return os.path.join(self.path, key + '.blocks'), os.path.join(self.path, key + '.progress')
+
+    def open(self, content: str, settings: dict, build_table) -> ReadingSession:
+        """Return the stored session of content or a new one.
+
+        build_table() returns a new (lazy) BlockTable of content, its blocks are only used if there is no session
+        with the same settings. If the text was read with other settings before, reading resumes at the block
+        containing the same position.
+        """
+        key = content_key(content)
+        session = None
+        try:
+            session = self.load(key, content)
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading reading session: {e}")
+
+        if session is not None and session.settings == settings:
+            table = build_table()
+            if session.table.complete:
+                # blocks that weren't prepared yet may still need the language runs
+                session.table.runs = table.runs
+            else:
+                # splitting is deterministic, so a lazy table has the same blocks as the stored part
+                session.table = table
+            return session
+
+        table = build_table()
+        position = 0
+        if session is not None and session.position and session.table.starts:
+            # same text, other blocks: resume at the block containing the old block's start
+            offset = session.table.starts[min(session.position, len(session.table.starts) - 1)]
+            while table.fill(position + 1) and table.starts[position + 1] <= offset:
+                position += 1
+        new = ReadingSession(key, table, settings, position=position)
+        new.changed = True
+        return new
+
+    def load(self, key: str, content: str):
+        """Read a session from disk. Returns None if its text doesn't match content.
+        """
+        blocks_file, progress_file = self.files(key)
+        with open(blocks_file, 'rb') as file:
+            header = json.loads(file.readline())
+            if header['version'] != VERSION or header['length'] != len(content):
+                return None
+
+            count, complete = header['count'], header['complete']
+            starts, ends, boundaries, languages, voices = array('q'), array('q'), array('b'), array('h'), array('h')
+            for numbers in (starts, ends, boundaries, languages, voices):
+                numbers.fromfile(file, count)
+
+        os.utime(blocks_file)  # most recently read sessions are kept longest
+
+        codes, catalog = header['languages'], header['voices']
+        table = BlockTable.from_arrays(content, starts, ends, boundaries)
+        table.complete = complete
+        session = ReadingSession(
+            key, table, header['settings'],
+            languages=[codes[i] if i >= 0 else None for i in languages],
+            voices=[catalog[i] if i >= 0 else None for i in voices],
+            position=self.load_position(progress_file, count if complete else None)
+        )
+        return session
+
+    @staticmethod
+    def load_position(progress_file: str, count=None) -> int:
+        """Return the last index of the progress log, 0 if there is none or it isn't below count.
+        """
+        try:
+            with open(progress_file, 'rb') as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() < 8:
+                    return 0
+                file.seek(-8, os.SEEK_END)
+                position = array('q', file.read(8))[0]
+        except OSError:
+            return 0
+        return position if 0 <= position and (count is None or position < count) else 0
+
+    def save(self, session: ReadingSession):
+        """Write blocks, languages and voices of session if they changed, then delete old sessions if the store is too big.
+        """
+        with self.lock:
+            if session.changed:
+                session.changed = False
+                self.write(session)
+
+    def write(self, session: ReadingSession):
+        table = session.table
+        # the worker may be splitting further meanwhile, take the blocks split until now
+        complete = table.complete
+        count = len(table.starts)
+        starts, ends, boundaries = table.starts[:count], table.ends[:count], table.boundaries[:count]
+        codes, catalog = {}, {}
+        languages, voices = array('h', [-1]) * count, array('h', [-1]) * count
+        for i, (language, voice) in enumerate(zip(session.languages[:count], session.voices[:count])):
+            if language is not None:
+                languages[i] = codes.setdefault(language, len(codes))
+            if voice is not None:
+                voices[i] = catalog.setdefault(voice['identifier'], (len(catalog), voice))[0]
+
+        header = {
+            'version': VERSION,
+            'length': len(table.content),
+            'count': count,
+            'complete': complete,
+            'settings': session.settings,
+            'languages': list(codes),
+            'voices': [voice for _, voice in catalog.values()],
+        }
+
+        blocks_file, _ = self.files(session.key)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write a temporary file first, so a session is never half written
+            with open(blocks_file + '.tmp', 'wb') as file:
+                file.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+                for numbers in (starts, ends, boundaries, languages, voices):
+                    numbers.tofile(file)
+            os.replace(blocks_file + '.tmp', blocks_file)
+        except OSError as e:
+            print(f"Error saving reading session: {e}")
+            return
+
+        self.save_position(session, session.position)
+        self.evict(keep=session.key)
+
+    def save_position(self, session: ReadingSession, index: int):
+        """Remember index as the block spoken last. Only appends to the session's progress log.
+        """
+        session.position = index
+        _, progress_file = self.files(session.key)
+        entry = array('q', [index]).tobytes()
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(progress_file, 'ab') as file:
+                file.write(entry)
+                full = file.tell() > PROGRESS_LOG_BYTES
+            if full:
+                with open(progress_file, 'wb') as file:
+                    file.write(entry)
+        except OSError as e:
+            print(f"Error saving reading position: {e}")
+
+    def evict(self, keep=None):
+        """Delete the least recently read sessions until the store fits into max_bytes. The session keep stays.
+        """
+        sessions = {}
+        try:
+            entries = list(os.scandir(self.path))
+        except OSError:
+            return
+
+        for entry in entries:
+            key, extension = os.path.splitext(entry.name)
+            if extension not in ('.blocks', '.progress'):
+                continue
+            stat = entry.stat()
+            size, used = sessions.get(key, (0, 0))
+            sessions[key] = (size + stat.st_size, max(used, stat.st_mtime))
+
+        total = sum(size for size, _ in sessions.values())
+        for key, (size, _) in sorted(sessions.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for file in self.files(key):
+                try:
+                    os.remove(file)
+                except FileNotFoundError:
+                    pass
+            total -= size
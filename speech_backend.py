@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import re
+
+# characters per second at rate 0.5, AVSpeechSynthesizer's default rate
+CHARS_PER_SECOND = 15.0
+WORD_PATTERN = re.compile(r'\S+')
+
+
+class SpeechBackend:
+    """Interface of speech synthesizers.
+
+    Backends call on_start() when an utterance starts and on_finish() when it is finished. A stopped utterance
+    doesn't finish, so on_finish() isn't called for it. Utterances spoken while another one is speaking are queued.
+    Before each word on_range(location, length) is called with the word's range in the utterance's text.
+    """
+    def __init__(self):
+        self.on_start = None
+        self.on_finish = None
+        self.on_range = None
+
+    def started(self):
+        if self.on_start:
+            self.on_start()
+
+    def will_speak(self, location: int, length: int):
+        if self.on_range:
+            self.on_range(location, length)
+
+    def finished(self):
+        if self.on_finish:
+            self.on_finish()
+
+    def speak(self, text: str, voice_id, rate: float):
+        raise NotImplementedError
+
+    def update_rate(self, rate: float):
+        """Change the rate of the latest utterance if it hasn't started yet.
+        """
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop speaking immediately and drop all queued utterances.
+        """
+        raise NotImplementedError
+
+    def is_speaking(self) -> bool:
+        raise NotImplementedError
+
+    def list_voices(self) -> list:
+        """Return all voices as dicts with name, language and identifier (see preferences.py).
+        """
+        raise NotImplementedError
+
+
+class ObjCSpeechBackend(SpeechBackend):
+    """Speaks with iOS' AVSpeechSynthesizer via objc_util. Only available in Pythonista.
+    """
+    def __init__(self):
+        super().__init__()
+        from objc_util import ObjCClass
+
+        self.SYNTHESIZER = ObjCClass('AVSpeechSynthesizer').alloc().init()
+        self.UTTERANCE = None
+
+        self.setup_delegate()
+
+    def setup_delegate(self):
+        """Helper to use ObjC's speech synthesizer's didStart-, didFinish- and willSpeakRange-methods.
+        The delegate calls self.started(), self.finished() and self.will_speak() which forward to on_start, on_finish and on_range.
+        """
+        from objc_util import create_objc_class
+
+        def speechSynthesizer_didStartSpeechUtterance_(_self, _cmd, synthesizer, utterance):
+            self.started()
+
+        def speechSynthesizer_didFinishSpeechUtterance_(_self, _cmd, synthesizer, utterance):
+            self.finished()
+
+        def speechSynthesizer_willSpeakRangeOfSpeechString_utterance_(_self, _cmd, synthesizer, characterRange, utterance):
+            self.will_speak(characterRange.location, characterRange.length)
+
+        DelegateClass = create_objc_class(
+            'SpeechSynthDelegate',
+            methods=[
+                speechSynthesizer_didStartSpeechUtterance_,
+                speechSynthesizer_didFinishSpeechUtterance_,
+                speechSynthesizer_willSpeakRangeOfSpeechString_utterance_,
+            ],
+            protocols=['AVSpeechSynthesizerDelegate']
+        )
+
+        self.delegate = DelegateClass.alloc().init()
+
+        try:
+            self.SYNTHESIZER.setDelegate_(self.delegate)
+        except Exception as e:
+            print(f"Error setting delegate: {e}")
+
+    def speak(self, text, voice_id, rate):
+        from objc_util import ObjCClass, ns
+
+        self.UTTERANCE = ObjCClass('AVSpeechUtterance').alloc().initWithString_(ns(text))
+        voice = ObjCClass('AVSpeechSynthesisVoice').voiceWithIdentifier_(ns(voice_id))
+        self.UTTERANCE.setVoice_(voice)
+        self.update_rate(rate)
+
+        self.SYNTHESIZER.speakUtterance_(self.UTTERANCE)
+
+    def update_rate(self, rate):
+        if self.UTTERANCE is not None:
+            self.UTTERANCE.setRate_(max(0, min(rate, 1)))
+
+    def stop(self):
+        if self.is_speaking():
+            self.SYNTHESIZER.stopSpeakingAtBoundary_(0)  # 0 steht für AVSpeechBoundaryImmediate
+
+    def is_speaking(self):
+        return bool(self.SYNTHESIZER.isSpeaking())
+
+    def list_voices(self):
+        from voices import enumerate_voices
+        return enumerate_voices()
+
+
+def chars_per_second(rate: float) -> float:
+    """Estimated number of characters spoken per second at rate (0 to 1).
+    """
+    return CHARS_PER_SECOND * max(rate, 0.05) / 0.5
+
+
+def speaking_time(text: str, rate: float) -> float:
+    """Estimated seconds to speak text at rate (0 to 1).
+    """
+    return len(text) / chars_per_second(rate)
+
+
+class FakeSpeechBackend(SpeechBackend):
+    """Deterministic headless stand-in for the synthesizer.
+
+    Nothing is spoken. Time is virtual: an utterance takes speaking_time(text, rate) seconds, and callbacks
+    fire while advance() or run_until_idle() moves the clock forward. Words are spoken at a constant number of
+    characters per second, with ranges reported like the real synthesizer unless word_ranges is False.
+    schedule() puts any other callable on the same clock, e.g. for timers of code under test.
+    """
+    def __init__(self, voices=None, start_latency=0.0, word_ranges=True):
+        super().__init__()
+        self.voices = voices or []
+        self.start_latency = start_latency
+        self.word_ranges = word_ranges
+
+        self.now = 0.0
+        self.events = []  # heap of (time, sequence, callable)
+        self.sequence = itertools.count()
+        self.utterances = []  # queued [text, voice_id, rate]
+        self.current = None
+        self.generation = 0  # bumped by stop() to drop events of stopped utterances
+        self.spoken = []  # (start, end, text, voice_id, rate) of every finished utterance
+
+    def schedule(self, delay: float, callback):
+        heapq.heappush(self.events, (self.now + delay, next(self.sequence), callback))
+
+    def speak(self, text, voice_id, rate):
+        self.utterances.append([text, voice_id, rate])
+        if self.current is None and len(self.utterances) == 1:
+            self.schedule(self.start_latency, self.start_next)
+
+    def update_rate(self, rate):
+        if self.utterances:
+            self.utterances[-1][2] = max(0, min(rate, 1))
+
+    def start_next(self):
+        if self.current is not None or not self.utterances:
+            return
+
+        text, voice_id, rate = self.utterances.pop(0)
+        self.current = (self.now, text, voice_id, rate)
+        generation = self.generation
+        self.started()
+        if self.word_ranges and self.on_range:
+            cps = chars_per_second(rate)
+            for word in WORD_PATTERN.finditer(text):
+                self.schedule(word.start() / cps, lambda r=word.span(): self.range(generation, *r))
+        self.schedule(speaking_time(text, rate), lambda: self.finish(generation))
+
+    def range(self, generation, start, end):
+        if generation == self.generation and self.current is not None:
+            self.will_speak(start, end - start)
+
+    def finish(self, generation):
+        if generation != self.generation or self.current is None:
+            return
+
+        start, text, voice_id, rate = self.current
+        self.spoken.append((start, self.now, text, voice_id, rate))
+        self.current = None
+        self.finished()
+        self.start_next()
+
+    def stop(self):
+        self.generation += 1
+        self.utterances = []
+        self.current = None
+
+    def is_speaking(self):
+        return self.current is not None or bool(self.utterances)
+
+    def list_voices(self):
+        return list(self.voices)
+
+    def advance(self, seconds: float):
+        """Move the clock forward by seconds and run all callbacks due until then.
+        """
+        end = self.now + seconds
+        while self.events and self.events[0][0] <= end:
+            self.now, _, callback = heapq.heappop(self.events)
+            callback()
+        self.now = end
+
+    def run_until_idle(self, limit=float('inf')):
+        """Run callbacks until nothing is left to do or the clock reaches limit.
+        """
+        while self.events and self.events[0][0] <= limit:
+            self.now, _, callback = heapq.heappop(self.events)
+            callback()
@@ -0,0 +1,98 @@
+import time
+
+from clipboard_watcher import start_timer
+
+
+class ViewUpdater:
+    """Coalesces display updates to at most one push per frame.
+
+    set() only records the wanted value of an element's attribute, e.g. ('text_block', 'text'). Once per frame
+    all attributes whose value differs from what the view shows are assigned, so any number of updates
+    between two frames, e.g. one per spoken word, cost at most one assignment per attribute.
+    """
+    def __init__(self, view, frame=1 / 15, schedule=start_timer, clock=time.perf_counter):
+        """
+        view: ui.View, or anything returning elements by name like FakeView
+        frame: minimum seconds between two pushes
+        schedule: callable(delay, callback) running callback after delay seconds, e.g. on the main thread with ui.delay
+        """
+        self.view = view
+        self.frame = frame
+        self.schedule = schedule
+        self.clock = clock
+
+        self.wanted = {}  # (element, attribute): value
+        self.shown = {}  # (element, attribute): value the view shows
+        self.scheduled = False
+        self.last_push = None
+        self.pushes = 0
+        self.mutations = 0
+
+    def set(self, element: str, attribute: str, value):
+        if attribute == 'text' and self.wanted.get((element, 'text'), self) != value:
+            # a range of the previous text doesn't apply to the new one
+            self.wanted.pop((element, 'selected_range'), None)
+        self.wanted[(element, attribute)] = value
+        if not self.scheduled:
+            self.scheduled = True
+            delay = 0.0 if self.last_push is None else max(0.0, self.last_push + self.frame - self.clock())
+            self.schedule(delay, self.push)
+
+    def highlight(self, element: str, start: int, length: int):
+        """Select the range of a TextView, e.g. the word being spoken, without touching its text.
+        """
+        self.set(element, 'selected_range', (start, start + length))
+
+    def push(self):
+        """Assign all changed values to the view. Texts go first, since a new text resets the selection.
+        """
+        self.scheduled = False
+        self.last_push = self.clock()
+        self.pushes += 1
+
+        changes = sorted(
+            (key for key, value in self.wanted.items() if self.shown.get(key, self) != value),
+            key=lambda key: key[1] != 'text'
+        )
+        for element, attribute in changes:
+            value = self.wanted[(element, attribute)]
+            try:
+                setattr(self.view[element], attribute, value)
+            except Exception as e:
+                print(f"Error updating {element}.{attribute}: {e}")
+                continue
+            self.shown[(element, attribute)] = value
+            self.mutations += 1
+            if attribute == 'text':
+                self.shown.pop((element, 'selected_range'), None)
+
+
+class FakeElement:
+    """Stand-in for a ui element that counts assignments to its attributes.
+    """
+    def __init__(self, view):
+        object.__setattr__(self, 'view', view)
+
+    def __setattr__(self, attribute, value):
+        if attribute == 'text':
+            # like a TextView, a new text clears the selection
+            self.__dict__.pop('selected_range', None)
+        object.__setattr__(self, attribute, value)
+        self.view.mutations += 1
+        if isinstance(value, str):
+            self.view.characters += len(value)
+
+
+class FakeView:
+    """Stand-in for a ui.View, e.g. for benchmarks. Elements are created on first access.
+    """
+    def __init__(self):
+        self.elements = {}
+        self.mutations = 0
+        self.characters = 0  # characters of all assigned strings, text assignments cost about their length
+
+    def __getitem__(self, name):
+        element = self.elements.get(name)
+        if element is None:
+            element = self.elements[name] = FakeElement(self)
+        return element
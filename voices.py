@@ -0,0 +1,106 @@
+import ast
+import json
+import os
+import threading
+
+from preferences import VOICE_PREFERENCES
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'voice_catalog.json')
+PREFERENCES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preferences.py')
+
+
+def enumerate_voices() -> list:
+    """List all installed voices as dicts with name, language and identifier (see preferences.py).
+    Each voice costs several ObjC bridge calls, so this is done once and cached on disk.
+    """
+    from objc_util import ObjCClass
+
+    return [
+        {'name': str(voice.name()), 'language': str(voice.language()), 'identifier': str(voice.identifier())}
+        for voice in ObjCClass('AVSpeechSynthesisVoice').speechVoices()
+    ]
+
+
+def reference_catalog(path=PREFERENCES_FILE) -> list:
+    """Return the voice catalog listed in preferences.py as list of dicts, e.g. for stand-in backends outside of Pythonista.
+    """
+    with open(path, encoding='utf-8') as file:
+        return [ast.literal_eval(line.strip()) for line in file if line.strip().startswith("{'name'")]
+
+
+class VoiceIndex:
+    """Maps a language prefix (e.g. 'en' or 'en-GB') to a ranked list of matching voices.
+
+    Ranking follows the behaviour of the former voice scan: the first voice whose name is in
+    VOICE_PREFERENCES comes first, otherwise the last voice of the catalog matching the language.
+    """
+    def __init__(self, voices: list, preferences=VOICE_PREFERENCES):
+        self.voices = voices
+        preferred = set(preferences)
+
+        matches = {}
+        for voice in voices:
+            language = voice['language']
+            # every prefix of a language code is a key, so lookups match like str.startswith
+            for i in range(len(language) + 1):
+                matches.setdefault(language[:i], []).append(voice)
+
+        self.ranking = {
+            prefix: [v for v in candidates if v['name'] in preferred]
+                    + [v for v in reversed(candidates) if v['name'] not in preferred]
+            for prefix, candidates in matches.items()
+        }
+
+    def ranked(self, language: str) -> list:
+        """Return all voices for language, best match first.
+        """
+        return self.ranking.get(language, [])
+
+    def select(self, language: str):
+        """Return the best voice for language or None if no voice speaks it.
+        """
+        candidates = self.ranking.get(language)
+        return candidates[0] if candidates else None
+
+
+def load_catalog(path=CATALOG_FILE):
+    """Return the cached voice catalog or None if there is no valid cache.
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            voices = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return voices if isinstance(voices, list) else None
+
+
+def save_catalog(voices: list, path=CATALOG_FILE):
+    try:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(voices, file, ensure_ascii=False, indent=0)
+    except OSError as e:
+        print(f"Error saving voice catalog: {e}")
+
+
+def load_voice_index(path=CATALOG_FILE, list_voices=enumerate_voices, on_update=None) -> VoiceIndex:
+    """Build the voice index from the cached catalog.
+
+    Without a cache the voices are enumerated right away. With a cache the index is returned
+    immediately and the installed voices are checked in a background thread. If they changed,
+    the cache is rewritten and on_update is called with a new index.
+    """
+    cached = load_catalog(path)
+    if cached is None:
+        voices = list_voices()
+        save_catalog(voices, path)
+        return VoiceIndex(voices)
+
+    def refresh():
+        voices = list_voices()
+        if voices != cached:
+            save_catalog(voices, path)
+            if on_update:
+                on_update(VoiceIndex(voices))
+
+    threading.Thread(target=refresh, daemon=True).start()
+    return VoiceIndex(cached)